@@ -0,0 +1,1341 @@
+bl_info = {
+    "name": "Texture Loader Add-on",
+    "blender": (3, 3, 20),
+    "category": "Object",
+}
+
+import bpy
+import os
+import time
+import traceback
+from array import array
+from bpy_extras.io_utils import ImportHelper, ExportHelper
+from bpy.props import StringProperty, BoolProperty, FloatProperty, IntProperty
+from bpy.types import Operator, Panel
+from bpy.app.handlers import persistent
+
+from . import texture_loader_core
+
+class MATERIAL_OT_get_names_from_json(Operator, ImportHelper):
+    bl_idname = "material.get_names_from_json"
+    bl_label = "Get Material Names from JSON"
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+    write_text_block: BoolProperty(
+        name="Write Text Block",
+        description="Write the names into a text block in the scripting tab",
+        default=True,
+    )
+    write_names_file: BoolProperty(
+        name="Write Names File",
+        description="Write the names, one per line, next to the JSON file",
+        default=False,
+    )
+    use_as_filter: BoolProperty(
+        name="Use as Load Textures Filter",
+        description="Write the names file and make Load Textures only read the info files of these materials",
+        default=False,
+    )
+
+    def execute(self, context):
+        file_path = self.filepath
+        if not os.path.exists(file_path):
+            self.report({'ERROR'}, "JSON file not found.")
+            return {'CANCELLED'}
+
+        text_block = None
+        if self.write_text_block:
+            text_block = bpy.data.texts.new(name="Material_Names")
+            text_block.clear()
+
+        names_path = os.path.splitext(file_path)[0] + "_names.lst"
+        names_file = None
+        if self.write_names_file or self.use_as_filter:
+            try:
+                names_file = open(names_path, 'w', encoding='utf-8')
+            except OSError as e:
+                self.report({'ERROR'}, f"Could not write {names_path}: {e}")
+                return {'CANCELLED'}
+
+        # Names are written in chunks so a full-map dump never sits in memory at once
+        names = set()
+        chunk = []
+        count = 0
+        try:
+            for name in texture_loader_core.iter_json_names(file_path):
+                chunk.append(name)
+                if len(chunk) >= 10000:
+                    self.write_names(chunk, count, text_block, names_file)
+                    count += len(chunk)
+                    chunk = []
+                if self.use_as_filter:
+                    names.add(name)
+            self.write_names(chunk, count, text_block, names_file)
+            count += len(chunk)
+        except ValueError as e:
+            self.report({'ERROR'}, f"Could not read {file_path}: {e}")
+            return {'CANCELLED'}
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not get the material names: {e}")
+            return {'CANCELLED'}
+        finally:
+            if names_file:
+                names_file.close()
+
+        if self.use_as_filter:
+            context.scene.texture_loader_names_file = names_path
+            texture_info_directory = context.scene.texture_info_directory
+            if texture_info_directory:
+                info_files = texture_loader_core.DirectoryIndex(texture_info_directory).update().find_files(
+                    texture_loader_core.INFO_EXTENSIONS)
+                lookup = texture_loader_core.build_name_lookup(names, info_files)
+                self.report({'INFO'}, f"{len(lookup)} of {len(names)} material names have an info file")
+
+        if text_block:
+            for area in bpy.context.screen.areas:
+                if area.type == 'TEXT_EDITOR':
+                    area.spaces.active.text = text_block
+                    break
+
+        self.report({'INFO'}, f"{count} material names loaded into the scripting tab.")
+        return {'FINISHED'}
+
+    def write_names(self, chunk, count, text_block, names_file):
+        if not chunk:
+            return
+        if text_block:
+            text_block.write((', ' if count else '') + ', '.join(chunk))
+        if names_file:
+            names_file.write('\n'.join(chunk) + '\n')
+
+def report_normalize_stats(operator, stats, label):
+    if stats['rolled_back']:
+        operator.report({'WARNING'}, f"Rolled back {stats['rolled_back']} changes left by an interrupted run")
+    for path in stats['conflicts']:
+        operator.report({'WARNING'}, f"Not renamed, target name already exists: {path}")
+    for error in stats['errors']:
+        operator.report({'WARNING'}, f"Could not process {error}")
+    operator.report({'INFO'}, f"{label} complete: {stats['renamed_info']} info files renamed, "
+                              f"{stats['renamed_textures']} textures renamed, {stats['rewritten']} info files rewritten, "
+                              f"{stats['unchanged']} files unchanged.")
+
+def publish_profile(operator, context, profiler):
+    # JSON report in the cache folder plus a summary for the panel
+    wm = context.window_manager
+    lines = profiler.summary_lines()
+    wm.texture_loader_profile = "\n".join(lines)
+    try:
+        wm.texture_loader_profile_path = profiler.save()
+    except OSError as e:
+        wm.texture_loader_profile_path = ""
+        print(f"Could not write profiling report: {e}")
+    operator.report({'INFO'}, f"{lines[0]}, report: {wm.texture_loader_profile_path}")
+    tag_panel_redraw(context)
+
+class MATERIAL_OT_normalize_files(Operator, ImportHelper):
+    bl_idname = "material.normalize_files"
+    bl_label = "Normalize Files (Suffixes and Special Characters)"
+    use_filter_folder = True
+
+    def execute(self, context):
+        stats = texture_loader_core.normalize_tree(self.filepath)
+        report_normalize_stats(self, stats, "Normalizing files")
+        return {'FINISHED'}
+
+class MATERIAL_OT_rename_files(Operator, ImportHelper):
+    bl_idname = "material.rename_files"
+    bl_label = "Rename TXT and MTL Files"
+    use_filter_folder = True
+
+    def execute(self, context):
+        stats = texture_loader_core.normalize_tree(self.filepath, rename_textures=False, rewrite_info=False)
+        report_normalize_stats(self, stats, "Renaming")
+        return {'FINISHED'}
+
+class MATERIAL_OT_rename_special_characters(Operator, ImportHelper):
+    bl_idname = "material.rename_special_characters"
+    bl_label = "Rename Special Characters in TXT and MTL Files"
+    use_filter_folder = True
+
+    def execute(self, context):
+        stats = texture_loader_core.normalize_tree(self.filepath, strip_suffix=False, rename_textures=False)
+        report_normalize_stats(self, stats, "Renaming special characters")
+        return {'FINISHED'}
+
+class MATERIAL_OT_rename_textures_files(Operator, ImportHelper):
+    bl_idname = "material.rename_textures_files"
+    bl_label = "Rename Textures Files Special Characters"
+    use_filter_folder = True
+
+    def execute(self, context):
+        stats = texture_loader_core.normalize_tree(self.filepath, strip_suffix=False, rewrite_info=False)
+        report_normalize_stats(self, stats, "Renaming of textures")
+        return {'FINISHED'}
+
+class MATERIAL_OT_cleanup_and_replace(Operator):
+    bl_idname = "material.cleanup_and_replace"
+    bl_label = "Cleanup and Replace Materials and Textures"
+
+    def cleanup_names(self, data, name_attr):
+        cleaned_names = {}
+
+        # Renaming reorders the collection, so iterate over a snapshot
+        for item in list(data):
+            name = getattr(item, name_attr)
+            base_name, suffix = texture_loader_core.split_numeric_suffix(name)
+            if suffix:
+                if data.get(base_name):
+                    cleaned_names[name] = base_name
+                else:
+                    setattr(item, name_attr, base_name)
+                    cleaned_names[name] = base_name
+
+        return cleaned_names
+
+    def build_material_users(self):
+        # material name -> [(mesh, slot index)]
+        material_users = {}
+        for mesh in bpy.data.meshes:
+            for i, mat in enumerate(mesh.materials):
+                if mat:
+                    material_users.setdefault(mat.name, []).append((mesh, i))
+        return material_users
+
+    def build_image_users(self):
+        # image name -> [(material, texture node)]
+        image_users = {}
+        for mat in bpy.data.materials:
+            if mat.use_nodes and mat.node_tree:
+                for node in mat.node_tree.nodes:
+                    if node.type == 'TEX_IMAGE' and node.image:
+                        image_users.setdefault(node.image.name, []).append((mat, node))
+        return image_users
+
+    def replace_materials_in_meshes(self, cleaned_materials, material_users):
+        replaced = 0
+        for old_name, new_name in cleaned_materials.items():
+            new_mat = bpy.data.materials.get(new_name)
+            if not new_mat:
+                continue
+            for mesh, i in material_users.get(old_name, ()):
+                mesh.materials[i] = new_mat
+                replaced += 1
+        return replaced
+
+    def replace_textures_in_materials(self, cleaned_textures, image_users):
+        replaced = 0
+        for old_name, new_name in cleaned_textures.items():
+            new_tex = bpy.data.images.get(new_name)
+            if not new_tex:
+                continue
+            for mat, node in image_users.pop(old_name, ()):
+                node.image = new_tex
+                image_users.setdefault(new_name, []).append((mat, node))
+                replaced += 1
+        return replaced
+
+    def collect_unused(self, image_users):
+        unused_materials = [mat for mat in bpy.data.materials if not mat.users]
+        removed = set(unused_materials)
+
+        # Images only used by materials that are about to be removed go too,
+        # so everything can be deleted in a single batch_remove
+        unused_textures = []
+        for tex in bpy.data.images:
+            users_in_removed = sum(1 for mat, node in image_users.get(tex.name, ()) if mat in removed)
+            if tex.users - users_in_removed <= 0:
+                unused_textures.append(tex)
+        return unused_materials, unused_textures
+
+    def execute(self, context):
+        profiler = texture_loader_core.Profiler("cleanup_and_replace")
+
+        # Names are cleaned first so the reverse indexes are keyed by final names
+        with profiler.stage('cleanup_names'):
+            cleaned_materials = self.cleanup_names(bpy.data.materials, 'name')
+            cleaned_textures = self.cleanup_names(bpy.data.images, 'name')
+
+        with profiler.stage('index_users'):
+            material_users = self.build_material_users()
+            image_users = self.build_image_users()
+
+        with profiler.stage('replace'):
+            replaced_materials = self.replace_materials_in_meshes(cleaned_materials, material_users)
+            replaced_textures = self.replace_textures_in_materials(cleaned_textures, image_users)
+
+        with profiler.stage('remove_unused'):
+            unused_materials, unused_textures = self.collect_unused(image_users)
+            bpy.data.batch_remove(unused_materials + unused_textures)
+
+        profiler.count('materials', len(bpy.data.materials))
+        profiler.count('images', len(bpy.data.images))
+        profiler.count('duplicate_material_names', len(cleaned_materials))
+        profiler.count('duplicate_image_names', len(cleaned_textures))
+        profiler.count('material_slots_replaced', replaced_materials)
+        profiler.count('texture_nodes_replaced', replaced_textures)
+        profiler.count('materials_removed', len(unused_materials))
+        profiler.count('images_removed', len(unused_textures))
+
+        self.report({'INFO'}, f"Material and texture names cleaned up and replaced in meshes and materials "
+                              f"({replaced_materials} material slots, {replaced_textures} texture nodes). "
+                              f"Removed {len(unused_materials)} unused materials and {len(unused_textures)} unused textures.")
+        publish_profile(self, context, profiler)
+        return {'FINISHED'}
+
+class MATERIAL_OT_mapping(Operator, ExportHelper):
+    bl_idname = "material.mapping"
+    bl_label = "Material Texture Mesh Mapping"
+    filename_ext = ".jsonl"
+    check_extension = None
+    filter_glob: StringProperty(default="*.jsonl;*.csv", options={'HIDDEN'})
+    write_text_block: BoolProperty(
+        name="Summary Text Block",
+        description="Also write the first materials of the mapping into a text block",
+        default=True,
+    )
+    summary_lines: IntProperty(
+        name="Summary Lines",
+        description="Number of materials listed in the summary text block",
+        default=200,
+        min=1,
+    )
+
+    def execute(self, context):
+        mesh_names = {}
+        for obj in bpy.data.objects:
+            if obj.type == 'MESH':
+                for slot in obj.material_slots:
+                    if slot.material:
+                        mesh_names.setdefault(slot.material.name, []).append(obj.name)
+
+        summary = ["Material to Texture and Mesh Mapping:", ""]
+        with texture_loader_core.MappingWriter(self.filepath) as writer:
+            for material in bpy.data.materials:
+                if material.use_nodes:
+                    texture_nodes = [node for node in material.node_tree.nodes if node.type == 'TEX_IMAGE']
+                    texture_paths = [node.image.name if node.image else 'No texture' for node in texture_nodes]
+                    textures = [node.image.name for node in texture_nodes if node.image]
+                else:
+                    texture_paths = ['No nodes']
+                    textures = []
+                meshes = mesh_names.get(material.name, [])
+                writer.write_material(material.name, textures, meshes)
+
+                if writer.material_count <= self.summary_lines:
+                    summary.append(f"{material.name} has textures: {', '.join(texture_paths)} and is applied to meshes: {', '.join(meshes)}")
+
+        hidden = writer.material_count - self.summary_lines
+        if hidden > 0:
+            summary.append(f"... {hidden} more materials, see {self.filepath}")
+        summary.append("")
+        summary.append(f"{writer.material_count} materials, {len(writer.texture_materials)} textures, "
+                       f"{len(writer.mesh_materials)} meshes")
+
+        if self.write_text_block:
+            text_block = bpy.data.texts.new(name="Material_Texture_Mesh_Mapping")
+            text_block.clear()
+            text_block.write("\n".join(summary) + "\n")
+
+            for area in bpy.context.screen.areas:
+                if area.type == 'TEXT_EDITOR':
+                    area.spaces.active.text = text_block
+                    break
+
+        self.report({'INFO'}, f"Material to Texture and Mesh Mapping written to {self.filepath}")
+        return {'FINISHED'}
+
+class TEXTURE_OT_select_texture_info_directory(Operator, ImportHelper):
+    bl_idname = "texture.select_texture_info_directory"
+    bl_label = "Select Texture Info Directory"
+    use_filter_folder = True
+
+    def execute(self, context):
+        context.scene.texture_info_directory = self.filepath
+        self.report({'INFO'}, f"Selected texture info directory: {self.filepath}")
+        return {'FINISHED'}
+
+
+class TEXTURE_OT_select_texture_directory(Operator, ImportHelper):
+    bl_idname = "texture.select_texture_directory"
+    bl_label = "Select Texture Directory"
+    use_filter_folder = True
+
+    def execute(self, context):
+        context.scene.texture_directory = self.filepath
+        self.report({'INFO'}, f"Selected texture directory: {self.filepath}")
+        return {'FINISHED'}
+
+
+MANIFEST_PROPERTY = "texture_loader_manifest"
+
+class TEXTURE_OT_load_textures(Operator):
+    bl_idname = "texture.load_textures"
+    bl_label = "Load Textures"
+
+    def add_file_extension(self, filename):
+        return texture_loader_core.add_file_extension(filename)
+
+    def build_node_tree(self, material, layout):
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+        nodes.clear()
+
+        output_node = nodes.new(type='ShaderNodeOutputMaterial')
+        output_node.location = (300, 0)
+
+        shader_node = nodes.new(type='ShaderNodeBsdfPrincipled')
+        shader_node.location = (0, 0)
+
+        links.new(shader_node.outputs['BSDF'], output_node.inputs['Surface'])
+
+        for semantic, input_name, location in texture_loader_core.TEXTURE_SLOTS:
+            if semantic not in layout:
+                continue
+            texture_node = nodes.new(type='ShaderNodeTexImage')
+            texture_node.name = semantic
+            texture_node.location = location
+            if input_name == 'Normal':
+                normal_map_node = nodes.new(type='ShaderNodeNormalMap')
+                normal_map_node.location = (-300, -600)
+                links.new(texture_node.outputs['Color'], normal_map_node.inputs['Color'])
+                links.new(normal_map_node.outputs['Normal'], shader_node.inputs['Normal'])
+            elif input_name in shader_node.inputs:
+                links.new(texture_node.outputs['Color'], shader_node.inputs[input_name])
+            else:
+                self.report({'WARNING'}, f"Input {input_name} not found in Principled BSDF shader")
+
+    def get_template(self, templates, layout):
+        # One prebuilt node tree per set of used slots; new materials are copies of it
+        template = templates.get(layout)
+        if template is None:
+            template = bpy.data.materials.new(name="TextureLoaderTemplate")
+            self.build_node_tree(template, layout)
+            templates[layout] = template
+        return template
+
+    def log(self, message, level='INFO'):
+        # Per-item messages, only with Verbose Logging
+        if self.verbose:
+            self.report({level}, message)
+
+    def load_image(self, image_name, texture_path):
+        image = bpy.data.images.get(image_name)
+        if image is not None:
+            self.profiler.count('images_reused')
+            self.log(f"Texture '{image_name}' already loaded. Using existing.")
+            return image
+        with self.profiler.stage('image_load'):
+            self.profiler.count('images_loaded')
+            if self.proxies is not None:
+                image = self.load_proxy(texture_path)
+                if image is not None:
+                    image.name = image_name
+                    return image
+            self.log(f"Loaded texture: {texture_path}")
+            return bpy.data.images.load(texture_path)
+
+    def load_proxy(self, texture_path):
+        proxy_path = self.proxy_paths.get(texture_path)
+        if proxy_path is not None:
+            image = bpy.data.images.load(proxy_path)
+        else:
+            # Pillow is not installed: downscale with Blender and save the proxy
+            proxy_path = self.proxies.proxy_path(texture_path)
+            if proxy_path is None:
+                return None
+            image = bpy.data.images.load(texture_path)
+            width, height = image.size
+            factor = self.proxies.factor
+            image.scale(max(1, width // factor), max(1, height // factor))
+            try:
+                os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+                image.filepath_raw = proxy_path
+                image.save()
+            except (OSError, RuntimeError) as e:
+                print(f"Could not save proxy for {texture_path}: {e}")
+                image.filepath_raw = texture_path
+                image.reload()
+                return image
+            self.proxies.generated += 1
+            self.proxy_paths[texture_path] = proxy_path
+        image[texture_loader_core.FULL_PATH_PROPERTY] = texture_path
+        image[texture_loader_core.PROXY_PATH_PROPERTY] = proxy_path
+        return image
+
+    def get_directory_index(self, directory):
+        with self.profiler.stage('scan'):
+            index = texture_loader_core.DirectoryIndex(directory).update()
+        self.profiler.count('index_folders_rescanned', index.rescanned_dirs)
+        self.profiler.count('index_folders_cached', index.reused_dirs)
+        print(f"Indexed {index.root}: {index.rescanned_dirs} folders rescanned, {index.reused_dirs} unchanged")
+        return index
+
+    def find_files(self, directory, extensions):
+        return self.get_directory_index(directory).find_files(extensions)
+
+    def build_mesh_index(self):
+        meshes = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+        return texture_loader_core.build_name_index(meshes, lambda obj: obj.name)
+
+    def assign_materials_to_meshes(self, materials, mesh_index):
+        assigned = {}
+        for material_name, material in materials.items():
+            for obj in mesh_index.get(material_name, ()):
+                # An exact name match beats a match through a ".001"-style duplicate name
+                exact = material_name in (obj.name, obj.name.replace("::", "_"))
+                if exact or obj.name not in assigned or not assigned[obj.name][2]:
+                    assigned[obj.name] = (obj, material, exact)
+
+        for obj, material, exact in assigned.values():
+            obj.data.materials.clear()
+            obj.data.materials.append(material)
+
+        self.report({'INFO'}, f"Assigned materials to {len(assigned)} meshes")
+        return len(assigned)
+
+    def prepare(self, context):
+        self.profiler = texture_loader_core.Profiler("load_textures")
+        self.verbose = context.scene.texture_loader_verbose
+        texture_info_directory = context.scene.texture_info_directory
+        texture_directory = context.scene.texture_directory
+
+        if not texture_info_directory or not texture_directory:
+            self.report({'ERROR'}, "Please select both the texture info directory and the texture directory")
+            return False
+
+        texture_info_index = self.get_directory_index(texture_info_directory)
+        texture_info_files = texture_info_index.find_files(texture_loader_core.INFO_EXTENSIONS)
+        names_file = context.scene.texture_loader_names_file
+        if names_file:
+            # Only read the info files of materials listed by Get Material Names from JSON
+            try:
+                names = texture_loader_core.read_names_file(bpy.path.abspath(names_file))
+            except OSError as e:
+                self.report({'ERROR'}, f"Could not read material names file {names_file}: {e}")
+                return False
+            texture_info_files = list(texture_loader_core.build_name_lookup(names, texture_info_files).values())
+        if not texture_info_files:
+            self.report({'ERROR'}, "No texture info files found in the selected directory")
+            return False
+
+        if texture_loader_core.DirectoryIndex(texture_directory).root == texture_info_index.root:
+            texture_index = texture_info_index
+        else:
+            texture_index = self.get_directory_index(texture_directory)
+        with self.profiler.stage('scan'):
+            self.texture_files_map, collisions = texture_index.file_map(texture_loader_core.TEXTURE_EXTENSIONS)
+        if self.verbose:
+            for name, paths in collisions.items():
+                print(f"Texture name '{name}' found in several folders, using {paths[0]}: {paths[1:]}")
+        if collisions:
+            self.report({'WARNING'}, f"{len(collisions)} texture names exist in more than one folder, "
+                                     f"enable Verbose Logging to list them")
+        self.profiler.count('texture_name_collisions', len(collisions))
+
+        with self.profiler.stage('parse'):
+            texture_infos, info_sources, parse_errors = texture_loader_core.parse_texture_info_files(texture_info_files)
+        self.profiler.count('info_files', len(texture_info_files))
+        self.profiler.count('parse_errors', len(parse_errors))
+        for path, error in parse_errors.items():
+            self.report({'WARNING'}, f"Could not read texture info file {path}: {error}")
+
+        scene = context.scene
+        self.share_materials = scene.texture_loader_share_materials
+        manifest_options = {
+            'texture_directory': texture_index.root,
+            'share_materials': self.share_materials,
+            'dedup_textures': scene.texture_loader_dedup_textures,
+            'package_index': scene.texture_loader_package_index,
+            'proxy_factor': scene.texture_loader_proxy_factor,
+        }
+        if scene.texture_loader_only_changed:
+            self.manifest = texture_loader_core.ImportManifest.from_json(scene.get(MANIFEST_PROPERTY), manifest_options)
+        else:
+            self.manifest = texture_loader_core.ImportManifest(manifest_options)
+
+        # Everything file-side is resolved up front so the textures the build
+        # will load can be prefetched in the same order
+        resolver = None
+        if scene.texture_loader_package_index:
+            resolver = texture_loader_core.HashNameResolver(bpy.path.abspath(scene.texture_loader_package_index))
+        resolved_infos = []
+        with self.profiler.stage('resolve'):
+            for material_name, texture_info in texture_infos.items():
+                resolved, missing = texture_loader_core.resolve_texture_slots(
+                    texture_info, self.texture_files_map, resolver=resolver)
+                resolved_infos.append((material_name, resolved, missing))
+
+        # State finish() relies on, also when cancelled while preparing
+        self.pending = []
+        self.done = 0
+        self.materials = {}
+        self.shared_materials = {}
+        self.templates = {}
+        self.skipped = 0
+        self.missing_textures = 0
+        self.proxies = None
+        self.proxy_paths = {}
+        self.prefetcher = None
+        self.library = None
+        self.library_pending = []
+        self.library_hashes = {}
+        self.library_materials = {}
+        self.steps = self.prepare_textures(scene, resolved_infos, info_sources)
+        self.step_progress = ("Preparing", 0, 1)
+        return True
+
+    def labelled_steps(self, label, steps):
+        while True:
+            try:
+                done, total = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            yield label, done, total
+
+    def prepare_textures(self, scene, resolved_infos, info_sources):
+        # Generator for the file work that can take minutes on a large map
+        # (content hashing, proxy generation). It yields (label, done, total)
+        # between batches, so the modal load keeps redrawing and Esc works.
+        profiler = self.profiler
+        if scene.texture_loader_dedup_textures:
+            hash_cache = texture_loader_core.ContentHashCache()
+            texture_paths = [texture_path for material_name, resolved, missing in resolved_infos
+                             for semantic, image_name, texture_path in resolved]
+            canonical = yield from self.labelled_steps(
+                "Hashing textures", profiler.steps('dedup', hash_cache.update_steps(texture_paths)))
+            duplicates = sum(1 for path, canonical_path in canonical.items() if path != canonical_path)
+            profiler.count('dedup_hashed', hash_cache.hashed_files)
+            profiler.count('dedup_cached', hash_cache.cached_files)
+            profiler.count('dedup_duplicates', duplicates)
+            self.report({'INFO'}, f"{duplicates} of {len(canonical)} textures are byte-identical copies "
+                                  f"({hash_cache.hashed_files} hashed, {hash_cache.cached_files} cached)")
+            resolved_infos = [(material_name, texture_loader_core.dedup_resolved(resolved, canonical), missing)
+                              for material_name, resolved, missing in resolved_infos]
+
+        loaded_images = {image.name for image in bpy.data.images}
+        prefetch_paths = []
+        pending = []
+        with profiler.stage('manifest'):
+            for material_name, resolved, missing in resolved_infos:
+                manifest_entry = self.manifest.make_entry(info_sources[material_name][1], resolved)
+                built_name = self.manifest.unchanged_material(material_name, manifest_entry)
+                pending.append((material_name, resolved, missing, manifest_entry, built_name))
+                if built_name is None:
+                    prefetch_paths.extend(texture_path for semantic, image_name, texture_path in resolved
+                                          if image_name not in loaded_images)
+
+        if scene.texture_loader_proxy_factor > 1:
+            self.proxies = texture_loader_core.ProxyCache(scene.texture_loader_proxy_factor, verbose=self.verbose)
+            workers = max(1, scene.texture_loader_prefetch_threads)
+            self.proxy_paths = yield from self.labelled_steps(
+                "Generating proxies", profiler.steps('proxies', self.proxies.generate_steps(prefetch_paths, workers)))
+            self.report({'INFO'}, f"Proxy textures: {self.proxies.generated} generated, {self.proxies.reused} cached"
+                                  + (f", {self.proxies.failed} failed" if self.proxies.failed else ""))
+            prefetch_paths = [self.proxy_paths.get(path, path) for path in prefetch_paths]
+
+        if scene.texture_loader_prefetch_threads > 0 and prefetch_paths:
+            self.prefetcher = texture_loader_core.TexturePrefetcher(
+                prefetch_paths, workers=scene.texture_loader_prefetch_threads).start()
+
+        # Library materials reference full-resolution textures
+        if scene.texture_loader_use_library and self.proxies is None:
+            self.library = texture_loader_core.MaterialLibrary(size_limit=scene.texture_loader_library_size * 1024 * 1024)
+            self.library.load()
+            candidates = []
+            for material_name, resolved, missing, manifest_entry, built_name in pending:
+                if built_name is None and material_name not in bpy.data.materials:
+                    input_hash = texture_loader_core.material_input_hash(manifest_entry)
+                    self.library_hashes[material_name] = input_hash
+                    candidates.append((material_name, input_hash, resolved))
+            with profiler.stage('library'):
+                self.library_materials = self.append_from_library(candidates)
+
+        self.pending = pending
+
+    def build_material(self, material_name, resolved, missing, manifest_entry, built_name):
+        manifest = self.manifest
+        self.missing_textures += len(missing)
+        for image_name in missing:
+            self.log(f"Texture file {image_name} not found in the directory", 'WARNING')
+        key = texture_loader_core.material_key(resolved)
+
+        material = bpy.data.materials.get(built_name) if built_name else None
+        if material is not None:
+            self.materials[material_name] = material
+            if self.share_materials:
+                self.shared_materials.setdefault(key, material)
+            self.skipped += 1
+            return
+
+        if self.share_materials and key in self.shared_materials:
+            self.materials[material_name] = self.shared_materials[key]
+            manifest.record(material_name, manifest_entry, self.shared_materials[key].name)
+            return
+
+        material = bpy.data.materials.get(material_name)
+        if material is None and material_name in self.library_materials:
+            material = self.library_materials.pop(material_name)
+            self.materials[material_name] = material
+            manifest.record(material_name, manifest_entry, material.name)
+            if self.share_materials:
+                self.shared_materials[key] = material
+            return
+        if material is None and material_name in self.library_hashes:
+            self.library_pending.append((material_name, self.library_hashes[material_name]))
+
+        if material is None:
+            template = self.get_template(self.templates, texture_loader_core.material_layout(resolved))
+            material = template.copy()
+            material.name = material_name
+        else:
+            self.build_node_tree(material, texture_loader_core.material_layout(resolved))
+
+        for semantic, image_name, texture_path in resolved:
+            material.node_tree.nodes[semantic].image = self.load_image(image_name, texture_path)
+            if self.prefetcher:
+                self.prefetcher.consumed(self.proxy_paths.get(texture_path, texture_path))
+
+        self.materials[material_name] = material
+        manifest.record(material_name, manifest_entry, material.name)
+        if self.share_materials:
+            self.shared_materials[key] = material
+        self.profiler.count('materials_built')
+        self.log(f"Material '{material_name}' created with textures")
+
+    def append_from_library(self, items):
+        # items: [(material_name, input_hash, resolved)]. Every library file
+        # with hits is opened once; returns {material_name: material}.
+        resolved_by_name = {material_name: resolved for material_name, input_hash, resolved in items}
+        hits = self.library.lookup_many([(material_name, input_hash) for material_name, input_hash, resolved in items])
+        appended = {}
+        for blend_path, found in hits.items():
+            try:
+                with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+                    available = set(data_from.materials)
+                    found = [(material_name, datablock) for material_name, datablock in found if datablock in available]
+                    data_to.materials = [datablock for material_name, datablock in found]
+            except (OSError, RuntimeError) as e:
+                print(f"Could not append materials from {blend_path}: {e}")
+                continue
+            for (material_name, datablock), material in zip(found, data_to.materials):
+                if material is None:
+                    continue
+                material.name = material_name
+                material.use_fake_user = False
+                self.relink_library_images(material, resolved_by_name[material_name])
+                appended[material_name] = material
+        return appended
+
+    def relink_library_images(self, material, resolved):
+        # Library materials were built from another export; their images are
+        # pointed at this export's files, or replaced by images already loaded
+        for semantic, image_name, texture_path in resolved:
+            node = material.node_tree.nodes.get(semantic) if material.node_tree else None
+            if node is None or node.image is None:
+                continue
+            appended = node.image
+            existing = bpy.data.images.get(image_name)
+            if existing is not None and existing != appended:
+                node.image = existing
+                if appended.users == 0:
+                    bpy.data.images.remove(appended)
+                continue
+            appended.name = image_name
+            if bpy.path.abspath(appended.filepath) != texture_path:
+                appended.filepath = texture_path
+
+    def publish_to_library(self):
+        # Everything built in this run goes into one library file
+        library = self.library
+        built = [(material_name, input_hash, self.materials[material_name])
+                 for material_name, input_hash in self.library_pending if material_name in self.materials]
+        self.library_pending = []
+        published = 0
+        if built:
+            blend_path = library.new_blend_path()
+            try:
+                bpy.data.libraries.write(blend_path, {material for material_name, input_hash, material in built},
+                                         fake_user=True, path_remap='ABSOLUTE')
+            except (OSError, RuntimeError) as e:
+                print(f"Could not write the material library file {blend_path}: {e}")
+                built = []
+            for material_name, input_hash, material in built:
+                library.add(material_name, input_hash, blend_path, material.name)
+                published += 1
+        if not library.save():
+            print(f"Could not update the material library catalog {library.catalog_path}")
+        self.report({'INFO'}, f"Material library: {library.hits} reused, {library.misses} built, "
+                              f"{published} added, {library.evicted} evicted")
+
+    def build_next(self):
+        item = self.pending[self.done]
+        self.done += 1
+        with self.profiler.stage('node_build'):
+            self.build_material(*item)
+
+    def finish(self, context):
+        # Also runs after a cancel, so everything built so far is recorded and assigned
+        profiler = self.profiler
+        if self.prefetcher:
+            self.prefetcher.stop()
+            profiler.count('prefetched_files', self.prefetcher.files_read)
+            profiler.count('prefetched_bytes', self.prefetcher.bytes_read)
+            print(f"Prefetched {self.prefetcher.files_read} textures ({self.prefetcher.bytes_read // (1024 * 1024)} MB)")
+
+        for template in self.templates.values():
+            bpy.data.materials.remove(template)
+        self.templates = {}
+        # Library materials a cancelled or shared build never used
+        if self.library_materials:
+            bpy.data.batch_remove(list(self.library_materials.values()))
+            self.library_materials = {}
+
+        context.scene[MANIFEST_PROPERTY] = self.manifest.to_json()
+        if self.library is not None:
+            with profiler.stage('library'):
+                self.publish_to_library()
+            profiler.count('library_hits', self.library.hits)
+            profiler.count('library_misses', self.library.misses)
+        if self.skipped:
+            self.report({'INFO'}, f"Skipped {self.skipped} of {self.done} materials whose info file and textures are unchanged")
+        if self.missing_textures and not self.verbose:
+            self.report({'WARNING'}, f"{self.missing_textures} texture files not found, enable Verbose Logging to list them")
+
+        if self.share_materials:
+            self.report({'INFO'}, f"{len(self.materials)} materials share {len(self.shared_materials)} unique texture sets")
+
+        with profiler.stage('mesh_assign'):
+            assigned = self.assign_materials_to_meshes(self.materials, self.build_mesh_index())
+
+        # Assign base materials to duplicated objects after textures are loaded
+        with profiler.stage('duplicates'):
+            removed_meshes = assign_base_material_to_duplicates(context.scene.texture_loader_instance_meshes, self.verbose)
+        if removed_meshes:
+            self.report({'INFO'}, f"Replaced {removed_meshes} duplicate meshes with shared ones")
+
+        profiler.count('materials', self.done)
+        profiler.count('materials_unchanged', self.skipped)
+        profiler.count('materials_shared', len(self.materials) - len(set(self.materials.values())))
+        profiler.count('textures_missing', self.missing_textures)
+        profiler.count('meshes_assigned', assigned)
+        profiler.count('meshes_removed', removed_meshes)
+        if self.proxies is not None:
+            profiler.count('proxies_generated', self.proxies.generated)
+            profiler.count('proxies_cached', self.proxies.reused)
+        publish_profile(self, context, profiler)
+
+    def execute(self, context):
+        if not self.prepare(context):
+            return {'CANCELLED'}
+
+        try:
+            texture_loader_core.run_steps(self.steps)
+            self.steps = None
+            while self.done < len(self.pending):
+                self.build_next()
+        except Exception as e:
+            self.finish(context)
+            self.report_build_error(e)
+            return {'CANCELLED'}
+
+        self.finish(context)
+        return {'FINISHED'}
+
+    def report_build_error(self, error):
+        traceback.print_exc()
+        if self.done:
+            where = f"at material '{self.pending[self.done - 1][0]}' after {self.done - 1} of {len(self.pending)}"
+        else:
+            where = "while preparing the textures"
+        self.report({'ERROR'}, f"Load Textures stopped {where}: {error}")
+
+    def invoke(self, context, event):
+        wm = context.window_manager
+        if wm.texture_loader_running:
+            self.report({'WARNING'}, "Load Textures is already running")
+            return {'CANCELLED'}
+        if not self.prepare(context):
+            return {'CANCELLED'}
+
+        self.time_budget = context.scene.texture_loader_time_budget / 1000.0
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0, 100)
+        wm.texture_loader_running = True
+        self.update_progress(context)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            preparing = self.steps is not None
+            self.stop(context)
+            if preparing:
+                self.report({'WARNING'}, "Load Textures cancelled while preparing the textures")
+            else:
+                self.report({'WARNING'}, f"Load Textures cancelled after {self.done} of {len(self.pending)} materials")
+            return {'CANCELLED'}
+
+        # Undo would free the materials and images this operator still holds
+        if event.type in {'Z', 'Y'} and (event.ctrl or event.oskey):
+            return {'RUNNING_MODAL'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        tick_start = time.perf_counter()
+        try:
+            while time.perf_counter() - tick_start < self.time_budget:
+                if self.steps is not None:
+                    try:
+                        self.step_progress = next(self.steps)
+                    except StopIteration:
+                        self.steps = None
+                elif self.done < len(self.pending):
+                    self.build_next()
+                else:
+                    break
+        except Exception as e:
+            self.steps = None
+            self.stop(context)
+            self.report_build_error(e)
+            return {'CANCELLED'}
+        self.update_progress(context)
+
+        if self.steps is not None or self.done < len(self.pending):
+            return {'RUNNING_MODAL'}
+
+        self.stop(context)
+        return {'FINISHED'}
+
+    def cancel(self, context):
+        self.stop(context)
+
+    def stop(self, context):
+        wm = context.window_manager
+        if not wm.texture_loader_running:
+            return
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        wm.texture_loader_running = False
+        if self.steps is not None:
+            self.steps.close()
+            self.steps = None
+        self.finish(context)
+        tag_panel_redraw(context)
+
+    def update_progress(self, context):
+        wm = context.window_manager
+        if self.steps is not None:
+            label, done, total = self.step_progress
+        else:
+            label, done, total = "Materials", self.done, len(self.pending)
+        percent = 100.0 * done / max(total, 1)
+        wm.progress_update(percent)
+        wm.texture_loader_progress = percent
+        wm.texture_loader_status = f"{label}: {done} / {total}"
+        tag_panel_redraw(context)
+
+class TEXTURE_OT_swap_resolution(Operator):
+    bl_idname = "texture.swap_resolution"
+    bl_label = "Swap Texture Resolution"
+
+    full_resolution: BoolProperty(name="Full Resolution", default=True)
+    selected_only: BoolProperty(name="Selected Objects Only", default=False)
+
+    def execute(self, context):
+        if self.selected_only:
+            images = material_images(slot.material for obj in context.selected_objects
+                                     for slot in obj.material_slots)
+        else:
+            images = set(bpy.data.images)
+
+        key = texture_loader_core.FULL_PATH_PROPERTY if self.full_resolution else texture_loader_core.PROXY_PATH_PROPERTY
+        swapped = 0
+        for image in images:
+            target = image.get(key)
+            if not target or bpy.path.abspath(image.filepath) == target or not os.path.exists(target):
+                continue
+            image.filepath = target
+            image.reload()
+            swapped += 1
+
+        resolution = "full resolution" if self.full_resolution else "proxy"
+        self.report({'INFO'}, f"Swapped {swapped} textures to {resolution}")
+        return {'FINISHED'}
+
+class TEXTURE_OT_free_image_buffers(Operator):
+    bl_idname = "texture.free_image_buffers"
+    bl_label = "Free Image Buffers"
+
+    def execute(self, context):
+        used = material_images(slot.material for obj in context.scene.objects for slot in obj.material_slots)
+        keep = {image.name for image in material_images(slot.material for obj in context.selected_objects
+                                                        for slot in obj.material_slots)}
+        loaded = {}
+        for image in bpy.data.images:
+            if image.has_data:
+                width, height = image.size
+                size = texture_loader_core.image_buffer_size(width, height, image.channels, image.is_float)
+                loaded[image.name] = (image, size, image in used)
+
+        budget = context.scene.texture_loader_memory_budget * 1024 * 1024
+        release, remaining = texture_loader_core.plan_buffer_release(
+            [(name, size, is_used) for name, (image, size, is_used) in loaded.items()], budget, keep)
+        freed = 0
+        for name in release:
+            image, size, is_used = loaded[name]
+            image.buffers_free()
+            freed += size
+
+        self.report({'INFO'}, f"Freed {len(release)} image buffers ({freed // (1024 * 1024)} MB), "
+                              f"{remaining // (1024 * 1024)} MB still loaded")
+        return {'FINISHED'}
+
+def material_images(materials):
+    images = set()
+    for mat in materials:
+        if mat and mat.use_nodes and mat.node_tree:
+            for node in mat.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image:
+                    images.add(node.image)
+    return images
+
+@persistent
+def reset_load_state(dummy):
+    # A file saved while Load Textures was running must not look busy when reopened
+    for wm in bpy.data.window_managers:
+        wm.texture_loader_running = False
+
+def tag_panel_redraw(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+# Helper functions to handle base material assignment for duplicated objects
+
+def collect_base_materials(verbose=False):
+    base_materials = {}
+    for mat in bpy.data.materials:
+        base_name = mat.name.rsplit(".", 1)[0]
+        if base_name not in base_materials:
+            base_materials[base_name] = mat
+            if verbose:
+                print(f"Collected base material: {base_name} -> {mat.name}")
+    return base_materials
+
+def assign_base_materials_to_object(obj, base_materials, verbose=False):
+    if obj.data.materials:
+        for i, mat in enumerate(obj.data.materials):
+            if mat:
+                base_name = mat.name.rsplit(".", 1)[0]
+                if base_name in base_materials:
+                    base_mat = base_materials[base_name]
+                    if base_mat and mat != base_mat:
+                        if verbose:
+                            print(f"Object '{obj.name}': Assigning '{base_mat.name}' to replace '{mat.name}' in material slot {i}")
+                        obj.data.materials[i] = base_mat
+                        if len(obj.material_slots) > i:
+                            obj.material_slots[i].material = base_mat
+    else:
+        base_name = obj.name.rsplit(".", 1)[0]
+        if base_name in base_materials:
+            base_mat = base_materials[base_name]
+            obj.data.materials.append(base_mat)
+            if verbose:
+                print(f"Assigned base material '{base_mat.name}' to object '{obj.name}' which had no material.")
+
+# Attribute data type -> (property, values per element, array type)
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ('value', 1, 'f'),
+    'INT': ('value', 1, 'i'),
+    'INT8': ('value', 1, 'i'),
+    'BOOLEAN': ('value', 1, None),
+    'FLOAT2': ('vector', 2, 'f'),
+    'INT32_2D': ('value', 2, 'i'),
+    'INT16_2D': ('value', 2, 'i'),
+    'FLOAT_VECTOR': ('vector', 3, 'f'),
+    'FLOAT_COLOR': ('color', 4, 'f'),
+    'BYTE_COLOR': ('color', 4, 'f'),
+    'QUATERNION': ('value', 4, 'f'),
+}
+
+def read_buffer(collection, prop, size, typecode):
+    if typecode is None:
+        values = [False] * size
+        collection.foreach_get(prop, values)
+        return bytes(values)
+    buffer = array(typecode, bytes(4 * size))
+    collection.foreach_get(prop, buffer)
+    return buffer
+
+def mesh_geometry_key(mesh):
+    # Vertex positions, edges, face corners, face sizes, per-face material
+    # indices, UVs, every generic attribute (vertex colors, custom normal
+    # data, ...), split normals and the assigned materials, read in bulk with
+    # foreach_get. Meshes with data that cannot be read this way get None and
+    # are never shared.
+    if mesh.shape_keys:
+        return None
+    buffers = [
+        read_buffer(mesh.vertices, 'co', 3 * len(mesh.vertices), 'f'),
+        read_buffer(mesh.edges, 'vertices', 2 * len(mesh.edges), 'i'),
+        read_buffer(mesh.loops, 'vertex_index', len(mesh.loops), 'i'),
+        read_buffer(mesh.polygons, 'loop_total', len(mesh.polygons), 'i'),
+        read_buffer(mesh.polygons, 'material_index', len(mesh.polygons), 'i'),
+        read_buffer(mesh.polygons, 'use_smooth', len(mesh.polygons), None),
+    ]
+    extra = [mat.name if mat else "" for mat in mesh.materials]
+    for uv_layer in mesh.uv_layers:
+        buffers.append(read_buffer(uv_layer.data, 'uv', 2 * len(mesh.loops), 'f'))
+        extra.append(uv_layer.name)
+    # Blender versions before color attributes keep vertex colors here
+    for color_layer in getattr(mesh, 'vertex_colors', ()):
+        buffers.append(read_buffer(color_layer.data, 'color', 4 * len(mesh.loops), 'f'))
+        extra.append(color_layer.name)
+    for attribute in mesh.attributes:
+        if attribute.name.startswith('.'):
+            # Selection and hide flags
+            continue
+        layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        if layout is None:
+            return None
+        prop, width, typecode = layout
+        buffers.append(read_buffer(attribute.data, prop, width * len(attribute.data), typecode))
+        extra.extend((attribute.name, attribute.domain, attribute.data_type))
+    if mesh.has_custom_normals:
+        if hasattr(mesh, 'corner_normals'):
+            buffers.append(read_buffer(mesh.corner_normals, 'vector', 3 * len(mesh.loops), 'f'))
+        else:
+            mesh.calc_normals_split()
+            buffers.append(read_buffer(mesh.loops, 'normal', 3 * len(mesh.loops), 'f'))
+    return texture_loader_core.geometry_key(buffers, extra)
+
+def assign_base_material_to_duplicates(instance_meshes=False, verbose=False):
+    # One pass over the objects fixes ".001" material copies, fills empty
+    # material lists and, optionally, relinks identical meshes to one datablock
+    base_materials = collect_base_materials(verbose)
+    processed_meshes = set()
+    shared_meshes = {}
+    mesh_keys = {}
+    replaced_meshes = []
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.data
+        if mesh not in processed_meshes:
+            assign_base_materials_to_object(obj, base_materials, verbose)
+            processed_meshes.add(mesh)
+
+        # Vertex group weights live on the mesh but their names on the object
+        if instance_meshes and not obj.vertex_groups:
+            if mesh not in mesh_keys:
+                mesh_keys[mesh] = mesh_geometry_key(mesh)
+            key = mesh_keys[mesh]
+            if key is None:
+                continue
+            shared_mesh = shared_meshes.setdefault(key, mesh)
+            if shared_mesh != mesh:
+                obj.data = shared_mesh
+                replaced_meshes.append(mesh)
+
+    orphaned_meshes = [mesh for mesh in set(replaced_meshes) if not mesh.users]
+    if orphaned_meshes:
+        bpy.data.batch_remove(orphaned_meshes)
+        print(f"Relinked duplicate geometry to {len(shared_meshes)} shared meshes, removed {len(orphaned_meshes)} meshes.")
+    return len(orphaned_meshes)
+
+class TEXTURE_PT_panel(Panel):
+    bl_label = "Texture Loader"
+    bl_idname = "TEXTURE_PT_panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'Texture Loader'
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator(MATERIAL_OT_get_names_from_json.bl_idname)
+        layout.operator(MATERIAL_OT_normalize_files.bl_idname)
+        layout.operator(MATERIAL_OT_rename_files.bl_idname)
+        layout.operator(MATERIAL_OT_rename_textures_files.bl_idname)
+        layout.operator(MATERIAL_OT_rename_special_characters.bl_idname)
+        layout.operator(TEXTURE_OT_select_texture_info_directory.bl_idname)
+        layout.operator(TEXTURE_OT_select_texture_directory.bl_idname)
+        layout.prop(context.scene, "texture_loader_package_index")
+        layout.prop(context.scene, "texture_loader_names_file")
+        layout.prop(context.scene, "texture_loader_share_materials")
+        layout.prop(context.scene, "texture_loader_only_changed")
+        layout.prop(context.scene, "texture_loader_dedup_textures")
+        layout.prop(context.scene, "texture_loader_instance_meshes")
+        layout.prop(context.scene, "texture_loader_use_library")
+        if context.scene.texture_loader_use_library:
+            layout.prop(context.scene, "texture_loader_library_size")
+        layout.prop(context.scene, "texture_loader_proxy_factor")
+        layout.prop(context.scene, "texture_loader_time_budget")
+        layout.prop(context.scene, "texture_loader_prefetch_threads")
+        wm = context.window_manager
+        if wm.texture_loader_running:
+            layout.prop(wm, "texture_loader_progress", text=wm.texture_loader_status, slider=True)
+            layout.label(text="Press Esc to cancel")
+        else:
+            layout.operator(TEXTURE_OT_load_textures.bl_idname)
+        layout.operator(TEXTURE_OT_swap_resolution.bl_idname)
+        layout.prop(context.scene, "texture_loader_memory_budget")
+        layout.operator(TEXTURE_OT_free_image_buffers.bl_idname)
+        layout.operator(MATERIAL_OT_cleanup_and_replace.bl_idname)
+        layout.operator(MATERIAL_OT_mapping.bl_idname)
+        layout.prop(context.scene, "texture_loader_verbose")
+        if wm.texture_loader_profile:
+            box = layout.box()
+            for line in wm.texture_loader_profile.split("\n"):
+                box.label(text=line)
+
+def menu_func(self, context):
+    self.layout.operator(TEXTURE_OT_select_texture_info_directory.bl_idname)
+    self.layout.operator(TEXTURE_OT_select_texture_directory.bl_idname)
+    self.layout.operator(TEXTURE_OT_load_textures.bl_idname)
+
+def register():
+    bpy.utils.register_class(MATERIAL_OT_get_names_from_json)
+    bpy.utils.register_class(MATERIAL_OT_normalize_files)
+    bpy.utils.register_class(MATERIAL_OT_rename_files)
+    bpy.utils.register_class(MATERIAL_OT_rename_textures_files)
+    bpy.utils.register_class(MATERIAL_OT_rename_special_characters)
+    bpy.utils.register_class(TEXTURE_OT_select_texture_info_directory)
+    bpy.utils.register_class(TEXTURE_OT_select_texture_directory)
+    bpy.utils.register_class(TEXTURE_OT_load_textures)
+    bpy.utils.register_class(TEXTURE_OT_swap_resolution)
+    bpy.utils.register_class(TEXTURE_OT_free_image_buffers)
+    bpy.utils.register_class(MATERIAL_OT_cleanup_and_replace)
+    bpy.utils.register_class(MATERIAL_OT_mapping)
+    bpy.utils.register_class(TEXTURE_PT_panel)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func)
+    bpy.types.Scene.texture_info_directory = StringProperty(name="Texture Info Directory", default="")
+    bpy.types.Scene.texture_directory = StringProperty(name="Texture Directory", default="")
+    bpy.types.Scene.texture_loader_package_index = StringProperty(
+        name="Package Index",
+        description="C2M package_index folder whose .wni tables name hashed semantics and images",
+        default="",
+        subtype='DIR_PATH',
+    )
+    bpy.types.Scene.texture_loader_names_file = StringProperty(
+        name="Material Names",
+        description="Names file written by Get Material Names from JSON; when set only these materials are loaded",
+        default="",
+        subtype='FILE_PATH',
+    )
+    bpy.types.Scene.texture_loader_share_materials = BoolProperty(
+        name="Share Identical Materials",
+        description="Materials that use exactly the same textures share one material",
+        default=False,
+    )
+    bpy.types.Scene.texture_loader_only_changed = BoolProperty(
+        name="Only Rebuild Changed Materials",
+        description="Skip materials whose info file and textures are unchanged since the last Load Textures",
+        default=True,
+    )
+    bpy.types.Scene.texture_loader_dedup_textures = BoolProperty(
+        name="Deduplicate Identical Textures",
+        description="Texture files with identical contents are loaded once, whatever their name or folder",
+        default=False,
+    )
+    bpy.types.Scene.texture_loader_instance_meshes = BoolProperty(
+        name="Instance Duplicate Meshes",
+        description="Objects whose meshes have identical geometry, UVs and materials share one mesh",
+        default=False,
+    )
+    bpy.types.Scene.texture_loader_use_library = BoolProperty(
+        name="Use Material Library",
+        description="Append materials built by earlier imports from the shared material library instead of rebuilding them",
+        default=False,
+    )
+    bpy.types.Scene.texture_loader_library_size = IntProperty(
+        name="Library Size (MB)",
+        description="Least recently used materials are removed from the library once it grows past this size",
+        default=2048,
+        min=16,
+    )
+    bpy.types.Scene.texture_loader_proxy_factor = IntProperty(
+        name="Proxy Downscale",
+        description="Load textures downscaled by this factor from a disk cache (1 loads full resolution)",
+        default=1,
+        min=1,
+        max=16,
+    )
+    bpy.types.Scene.texture_loader_memory_budget = IntProperty(
+        name="Image Memory Budget (MB)",
+        description="Free Image Buffers frees the largest images in use until their pixels fit in this budget",
+        default=4096,
+        min=64,
+    )
+    bpy.types.Scene.texture_loader_verbose = BoolProperty(
+        name="Verbose Logging",
+        description="Report every texture, material and assignment instead of only the summaries",
+        default=False,
+    )
+    bpy.types.Scene.texture_loader_time_budget = FloatProperty(
+        name="Time Budget (ms)",
+        description="How long Load Textures may block the interface between redraws",
+        default=50.0,
+        min=5.0,
+        max=1000.0,
+    )
+    bpy.types.Scene.texture_loader_prefetch_threads = IntProperty(
+        name="Prefetch Threads",
+        description="Threads reading texture files ahead of node creation (0 disables prefetching)",
+        default=4,
+        min=0,
+        max=32,
+    )
+    bpy.types.WindowManager.texture_loader_running = BoolProperty(default=False)
+    bpy.types.WindowManager.texture_loader_progress = FloatProperty(
+        name="Progress",
+        subtype='PERCENTAGE',
+        min=0.0,
+        max=100.0,
+    )
+    bpy.types.WindowManager.texture_loader_status = StringProperty(default="")
+    bpy.types.WindowManager.texture_loader_profile = StringProperty(default="")
+    bpy.types.WindowManager.texture_loader_profile_path = StringProperty(default="")
+    bpy.app.handlers.load_post.append(reset_load_state)
+
+def unregister():
+    bpy.utils.unregister_class(MATERIAL_OT_get_names_from_json)
+    bpy.utils.unregister_class(MATERIAL_OT_normalize_files)
+    bpy.utils.unregister_class(MATERIAL_OT_rename_files)
+    bpy.utils.unregister_class(MATERIAL_OT_rename_textures_files)
+    bpy.utils.unregister_class(MATERIAL_OT_rename_special_characters)
+    bpy.utils.unregister_class(TEXTURE_OT_select_texture_info_directory)
+    bpy.utils.unregister_class(TEXTURE_OT_select_texture_directory)
+    bpy.utils.unregister_class(TEXTURE_OT_load_textures)
+    bpy.utils.unregister_class(TEXTURE_OT_swap_resolution)
+    bpy.utils.unregister_class(TEXTURE_OT_free_image_buffers)
+    bpy.utils.unregister_class(MATERIAL_OT_cleanup_and_replace)
+    bpy.utils.unregister_class(MATERIAL_OT_mapping)
+    bpy.utils.unregister_class(TEXTURE_PT_panel)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func)
+    del bpy.types.Scene.texture_info_directory
+    del bpy.types.Scene.texture_directory
+    del bpy.types.Scene.texture_loader_package_index
+    del bpy.types.Scene.texture_loader_names_file
+    del bpy.types.Scene.texture_loader_share_materials
+    del bpy.types.Scene.texture_loader_only_changed
+    del bpy.types.Scene.texture_loader_dedup_textures
+    del bpy.types.Scene.texture_loader_instance_meshes
+    del bpy.types.Scene.texture_loader_use_library
+    del bpy.types.Scene.texture_loader_library_size
+    del bpy.types.Scene.texture_loader_proxy_factor
+    del bpy.types.Scene.texture_loader_memory_budget
+    del bpy.types.Scene.texture_loader_verbose
+    del bpy.types.Scene.texture_loader_time_budget
+    del bpy.types.Scene.texture_loader_prefetch_threads
+    bpy.app.handlers.load_post.remove(reset_load_state)
+    del bpy.types.WindowManager.texture_loader_running
+    del bpy.types.WindowManager.texture_loader_progress
+    del bpy.types.WindowManager.texture_loader_status
+    del bpy.types.WindowManager.texture_loader_profile
+    del bpy.types.WindowManager.texture_loader_profile_path
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,255 @@
+# Headless batch runner for the Texture Loader add-on.
+#
+#   blender -b --python texture_loader/texture_loader_batch.py -- EXPORT_OR_BLEND [...] --output-dir OUT [--shards N]
+#
+# Every job is an export folder (info files and textures, optionally with a
+# .blend of the same name inside it) or a .blend whose folder holds the
+# export. Each job runs Load Textures and Cleanup and Replace, saves
+# OUT/<job>.blend and writes OUT/<job>.summary.json. Jobs whose summary says
+# "ok" are skipped on the next run unless --no-resume is given. With
+# --shards N the jobs are split over N background Blender processes; the
+# controller can also be started with plain Python if --blender is given.
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import traceback
+
+ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
+if ADDON_DIR not in sys.path:
+    sys.path.append(ADDON_DIR)
+
+import texture_loader_core
+
+# The add-on is the package this script ships in
+ADDON_PACKAGE = os.path.basename(ADDON_DIR)
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="texture_loader_batch", description="Run the Texture Loader on many exports")
+    parser.add_argument("inputs", nargs="*", help="Export folders or .blend files")
+    parser.add_argument("--jobs-file", help="Text file with one export folder or .blend per line")
+    parser.add_argument("--output-dir", required=True, help="Where .blend files and summaries are written")
+    parser.add_argument("--texture-subdir", default="", help="Texture folder inside each export folder")
+    parser.add_argument("--info-subdir", default="", help="Info file folder inside each export folder")
+    parser.add_argument("--package-index", default="", help="C2M package_index folder for hashed names")
+    parser.add_argument("--share-materials", action="store_true")
+    parser.add_argument("--dedup-textures", action="store_true")
+    parser.add_argument("--instance-meshes", action="store_true")
+    parser.add_argument("--use-library", action="store_true", help="Reuse materials from the shared material library")
+    parser.add_argument("--verbose", action="store_true", help="Log every texture, material and assignment")
+    parser.add_argument("--no-cleanup", action="store_true", help="Skip Cleanup and Replace")
+    parser.add_argument("--no-resume", action="store_true", help="Run jobs again even if they already succeeded")
+    parser.add_argument("--shards", type=int, default=1, help="Number of background Blender processes")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", ""), help="Blender executable for the shards")
+    parser.add_argument("--shard", type=int, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def script_args():
+    # Blender passes its own arguments too; ours come after "--"
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return sys.argv[1:]
+
+
+def collect_jobs(args):
+    inputs = list(args.inputs)
+    if args.jobs_file:
+        with open(args.jobs_file, 'r', encoding='utf-8') as f:
+            inputs.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+    jobs = []
+    names = set()
+    for path in inputs:
+        path = os.path.abspath(path)
+        if path.lower().endswith('.blend'):
+            export_dir = os.path.dirname(path)
+            blend = path
+        else:
+            export_dir = path
+            candidate = os.path.join(path, os.path.basename(path) + '.blend')
+            blend = candidate if os.path.exists(candidate) else None
+        name = os.path.splitext(os.path.basename(path))[0]
+        unique_name = name
+        counter = 1
+        while unique_name in names:
+            counter += 1
+            unique_name = f"{name}_{counter}"
+        names.add(unique_name)
+        jobs.append({
+            'name': unique_name,
+            'blend': blend,
+            'info_directory': os.path.join(export_dir, args.info_subdir),
+            'texture_directory': os.path.join(export_dir, args.texture_subdir),
+            'output': os.path.join(args.output_dir, unique_name + '.blend'),
+            'summary': os.path.join(args.output_dir, unique_name + '.summary.json'),
+        })
+    return jobs
+
+
+def read_summary(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def job_done(job):
+    summary = read_summary(job['summary'])
+    return bool(summary) and summary.get('status') == 'ok' and os.path.exists(job['output'])
+
+
+# Worker side, runs inside Blender
+
+_addon = None
+
+
+def register_addon():
+    global _addon
+    if _addon is None:
+        import importlib
+        parent_dir = os.path.dirname(ADDON_DIR)
+        if parent_dir not in sys.path:
+            sys.path.append(parent_dir)
+        _addon = importlib.import_module(ADDON_PACKAGE)
+        _addon.register()
+    return _addon
+
+
+def run_job(job, args):
+    summary = {'job': job['name'], 'status': 'failed', 'input': job['blend'], 'output': job['output'], 'stages': {}}
+    start = time.perf_counter()
+
+    def stage(name, func):
+        stage_start = time.perf_counter()
+        result = func()
+        summary['stages'][name] = round(time.perf_counter() - stage_start, 3)
+        return result
+
+    try:
+        if job['blend']:
+            stage('open', lambda: bpy.ops.wm.open_mainfile(filepath=job['blend']))
+        else:
+            stage('open', lambda: bpy.ops.wm.read_factory_settings(use_empty=True))
+
+        scene = bpy.context.scene
+        scene.texture_info_directory = job['info_directory']
+        scene.texture_directory = job['texture_directory']
+        scene.texture_loader_package_index = args.package_index
+        scene.texture_loader_share_materials = args.share_materials
+        scene.texture_loader_dedup_textures = args.dedup_textures
+        scene.texture_loader_instance_meshes = args.instance_meshes
+        scene.texture_loader_use_library = args.use_library
+        scene.texture_loader_verbose = args.verbose
+        wm = bpy.context.window_manager
+
+        result = stage('load_textures', lambda: bpy.ops.texture.load_textures())
+        if 'FINISHED' not in result:
+            raise RuntimeError(f"Load Textures returned {sorted(result)}")
+        summary['profiles'] = {'load_textures': wm.texture_loader_profile_path}
+        if not args.no_cleanup:
+            stage('cleanup', lambda: bpy.ops.material.cleanup_and_replace())
+            summary['profiles']['cleanup_and_replace'] = wm.texture_loader_profile_path
+
+        os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+        stage('save', lambda: bpy.ops.wm.save_as_mainfile(filepath=job['output'], copy=True))
+
+        summary['materials'] = len(bpy.data.materials)
+        summary['images'] = len(bpy.data.images)
+        summary['meshes'] = len(bpy.data.meshes)
+        summary['objects'] = len(bpy.data.objects)
+        summary['status'] = 'ok'
+    except Exception as e:
+        summary['error'] = f"{type(e).__name__}: {e}"
+        summary['traceback'] = traceback.format_exc()
+
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    texture_loader_core.write_json_atomic(job['summary'], summary)
+    print(f"[texture_loader_batch] {job['name']}: {summary['status']} in {summary['seconds']}s")
+    return summary
+
+
+def run_worker(jobs, args):
+    register_addon()
+    return [run_job(job, args) for job in jobs]
+
+
+# Controller side
+
+def spawn_shards(args, argv, shards):
+    blender = args.blender or (bpy.app.binary_path if bpy else "blender")
+    processes = []
+    for shard in range(shards):
+        command = [blender, "-b", "--factory-startup", "--python", os.path.realpath(__file__), "--"]
+        # The last --shards wins, so every shard splits the jobs the same way
+        command += argv + ["--shards", str(shards), "--shard", str(shard)]
+        log_path = os.path.join(args.output_dir, f"shard_{shard}.log")
+        log = open(log_path, 'w', encoding='utf-8')
+        processes.append((subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT), log))
+        print(f"[texture_loader_batch] started shard {shard}, log: {log_path}")
+
+    failed_shards = 0
+    for process, log in processes:
+        if process.wait() != 0:
+            failed_shards += 1
+        log.close()
+    return failed_shards
+
+
+def write_batch_summary(jobs, args, failed_shards=0):
+    results = []
+    for job in jobs:
+        summary = read_summary(job['summary']) or {'job': job['name'], 'status': 'missing'}
+        results.append({key: summary.get(key) for key in ('job', 'status', 'seconds', 'output', 'error')})
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    texture_loader_core.write_json_atomic(os.path.join(args.output_dir, "batch_summary.json"),
+                                          {'counts': counts, 'failed_shards': failed_shards, 'jobs': results})
+    return counts
+
+
+def main():
+    argv = script_args()
+    args = parse_args(argv)
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = collect_jobs(args)
+    shards = max(1, min(args.shards, len(jobs)))
+
+    if args.shard is not None:
+        shard_jobs = [job for job in jobs[args.shard::shards] if args.no_resume or not job_done(job)]
+        summaries = run_worker(shard_jobs, args)
+        sys.exit(0 if all(s['status'] == 'ok' for s in summaries) else 1)
+
+    pending = [job for job in jobs if args.no_resume or not job_done(job)]
+    print(f"[texture_loader_batch] {len(jobs)} jobs, {len(jobs) - len(pending)} already done")
+    failed_shards = 0
+    if pending:
+        if shards == 1 and bpy is not None:
+            run_worker(pending, args)
+        else:
+            if bpy is None and not args.blender:
+                sys.exit("--blender is required when not running inside Blender")
+            failed_shards = spawn_shards(args, argv, shards)
+            if failed_shards:
+                print(f"[texture_loader_batch] {failed_shards} of {shards} shards exited with an error, "
+                      f"see the shard_*.log files in {args.output_dir}")
+
+    counts = write_batch_summary(jobs, args, failed_shards)
+    print(f"[texture_loader_batch] finished: {counts}")
+    if counts.get('ok', 0) != len(jobs):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
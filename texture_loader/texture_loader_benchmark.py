@@ -0,0 +1,411 @@
+# Benchmarks for the Texture Loader pipeline on synthetic exports.
+#
+#   python texture_loader/texture_loader_benchmark.py --materials 1000 10000 100000 [--blender PATH]
+#   blender -b --python texture_loader/texture_loader_benchmark.py -- --materials 1000
+#
+# For every size a fresh export tree is generated (info files in the
+# C2M/Grayhound "semantic,image" format, tiny PNG textures, nested folders,
+# "_images" suffixes and ~&$ characters) and the file-side stages are timed in
+# plain Python. The Blender stages run too when the script runs inside Blender
+# or --blender is given. One JSON record per size is appended to --output;
+# --compare prints the ratio to the matching sizes of an earlier results file.
+
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import shutil
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+
+ADDON_DIR = os.path.dirname(os.path.realpath(__file__))
+if ADDON_DIR not in sys.path:
+    sys.path.append(ADDON_DIR)
+
+import texture_loader_core
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+RESULTS_VERSION = 1
+UNMAPPED_SEMANTIC = 'unk_semantic_0x1D3F0C2A'
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="texture_loader_benchmark", description="Time the Texture Loader on synthetic exports")
+    parser.add_argument("--materials", type=int, nargs="+", default=[1000, 10000], help="Material counts to benchmark")
+    parser.add_argument("--textures", type=int, default=0, help="Texture files per run (default: twice the materials)")
+    parser.add_argument("--depth", type=int, default=3, help="Folder nesting depth")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the fastest time of each stage is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.jsonl", help="JSON Lines file the results are appended to")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--work-dir", help="Where fixtures are generated (default: a temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated fixtures")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", ""), help="Blender executable for the bpy stages")
+    parser.add_argument("--no-bpy", action="store_true", help="Only time the file-side stages")
+    parser.add_argument("--bpy-fixture", help=argparse.SUPPRESS)
+    parser.add_argument("--bpy-result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def script_args():
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return sys.argv[1:]
+
+
+# Fixture generation
+
+def png_bytes(width, height, rgb):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    row = b"\x00" + bytes(rgb) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(row * height)) + chunk(b"IEND", b""))
+
+
+def nested_folder(root, index, depth, fanout=16):
+    parts = []
+    for level in range(depth):
+        index //= fanout
+        parts.append(f"group_{level}_{index % fanout:02d}")
+    return os.path.join(root, *reversed(parts))
+
+
+def texture_name(index):
+    # Every 7th texture has the characters the rename operators replace
+    if index % 7 == 0:
+        return f"tex~{index:06d}&a$"
+    return f"tex_{index:06d}"
+
+
+def material_slots(index):
+    slots = ['colorMap', 'specularMap', 'normalMap']
+    if index % 3 == 0:
+        slots.append('unk_semantic_0xB60D1850')
+    if index % 5 == 0:
+        slots.append('unk_semantic_0xCFE18444')
+    if index % 11 == 0:
+        slots.append(UNMAPPED_SEMANTIC)
+    return slots
+
+
+def generate_fixture(root, materials, textures=0, depth=3, seed=0):
+    # root/info holds the info files, root/textures the images and
+    # root/materials.json the material dump read by Get Material Names
+    rng = random.Random(seed)
+    textures = textures or 2 * materials
+    info_dir = os.path.join(root, "info")
+    texture_dir = os.path.join(root, "textures")
+    json_path = os.path.join(root, "materials.json")
+
+    pngs = [png_bytes(4, 4, (rng.randrange(256), rng.randrange(256), rng.randrange(256))) for i in range(16)]
+    for i in range(textures):
+        folder = nested_folder(texture_dir, i, depth)
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, texture_name(i) + ".png"), 'wb') as f:
+            f.write(pngs[i % len(pngs)])
+
+    material_names = []
+    for i in range(materials):
+        name = f"mtl_{i:06d}"
+        material_names.append(name)
+        rows = ["semantic,image_name"]
+        for k, semantic in enumerate(material_slots(i)):
+            image = texture_name((i * 3 + k) % textures)
+            # Some images are referenced with their extension, most without
+            rows.append(f"{semantic},{image}.png" if i % 4 == 0 else f"{semantic},{image}")
+        folder = nested_folder(info_dir, i, depth)
+        os.makedirs(folder, exist_ok=True)
+        suffix = texture_loader_core.IMAGES_SUFFIX if i % 2 == 0 else ""
+        with open(os.path.join(folder, name + suffix + ".txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(rows) + "\n")
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        f.write("{\n")
+        for i, name in enumerate(material_names):
+            entry = {'Name': name, 'Images': [texture_name((i * 3 + k) % textures) for k in range(3)]}
+            f.write(f"{'' if i == 0 else ','}\n  {json.dumps(name)}: {json.dumps(entry)}")
+        f.write("\n}\n")
+
+    return {'root': root, 'info_dir': info_dir, 'texture_dir': texture_dir, 'json_path': json_path,
+            'materials': materials, 'textures': textures}
+
+
+# File-side stages
+
+def timed(stages, name, func):
+    start = time.perf_counter()
+    result = func()
+    stages[name] = time.perf_counter() - start
+    return result
+
+
+def run_file_stages(fixture, cache_dir):
+    stages = {}
+    counts = {}
+    info_dir = fixture['info_dir']
+    texture_dir = fixture['texture_dir']
+
+    info_index = texture_loader_core.DirectoryIndex(info_dir, cache_dir)
+    info_files = timed(stages, 'find_files_cold', lambda: info_index.update().find_files(texture_loader_core.INFO_EXTENSIONS))
+    timed(stages, 'find_files_warm', lambda: texture_loader_core.DirectoryIndex(info_dir, cache_dir).update()
+          .find_files(texture_loader_core.INFO_EXTENSIONS))
+    texture_index = texture_loader_core.DirectoryIndex(texture_dir, cache_dir)
+    texture_files_map, collisions = timed(stages, 'texture_map', lambda: texture_index.update().file_map(
+        texture_loader_core.TEXTURE_EXTENSIONS))
+    counts['info_files'] = len(info_files)
+    counts['texture_files'] = len(texture_files_map)
+
+    texture_infos, sources, errors = timed(stages, 'parse', lambda: texture_loader_core.parse_texture_info_files(info_files))
+    timed(stages, 'parse_threads', lambda: texture_loader_core.parse_texture_info_files(info_files, workers=8))
+    if bpy is None:
+        timed(stages, 'parse_processes', lambda: texture_loader_core.parse_texture_info_files(
+            info_files, workers=os.cpu_count() or 1, use_processes=True, chunk_size=1024))
+    counts['parse_errors'] = len(errors)
+
+    def resolve():
+        missing = 0
+        for texture_info in texture_infos.values():
+            missing += len(texture_loader_core.resolve_texture_slots(texture_info, texture_files_map)[1])
+        return missing
+
+    counts['missing_textures'] = timed(stages, 'resolve', resolve)
+
+    names = timed(stages, 'json_names', lambda: list(texture_loader_core.iter_json_names(fixture['json_path'])))
+    counts['json_names'] = len(names)
+    timed(stages, 'name_lookup', lambda: texture_loader_core.build_name_lookup(names, info_files))
+
+    stats = timed(stages, 'normalize', lambda: texture_loader_core.normalize_tree(fixture['root']))
+    counts['renamed_info'] = stats['renamed_info']
+    counts['renamed_textures'] = stats['renamed_textures']
+    counts['rewritten_info'] = stats['rewritten']
+    timed(stages, 'normalize_unchanged', lambda: texture_loader_core.normalize_tree(fixture['root']))
+    return stages, counts
+
+
+# Blender stages, inside Blender
+
+def add_mesh_objects(names):
+    scene = bpy.context.scene
+    vertices = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0)]
+    for i, name in enumerate(names):
+        mesh = bpy.data.meshes.new(name)
+        mesh.from_pydata(vertices, [], [(0, 1, 2, 3)])
+        scene.collection.objects.link(bpy.data.objects.new(name, mesh))
+        # Every 10th object also gets a ".001" copy for the duplicate handling
+        if i % 10 == 0:
+            copy = bpy.data.objects.new(name + ".001", mesh.copy())
+            scene.collection.objects.link(copy)
+
+
+def read_profile(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def add_profile(stages, counts, prefix, profile):
+    if not profile:
+        return
+    for name, stage in profile['stages'].items():
+        stages[f"{prefix}.{name}"] = stage['seconds']
+    for name, value in profile['counters'].items():
+        counts[f"{prefix}.{name}"] = value
+    if profile.get('peak_memory'):
+        counts['peak_memory'] = max(counts.get('peak_memory', 0), profile['peak_memory'])
+
+
+def run_bpy_stages(fixture_root):
+    import texture_loader_batch
+
+    stages = {}
+    counts = {}
+    names = [f"mtl_{i:06d}" for i in range(read_fixture_info(fixture_root)['materials'])]
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    texture_loader_batch.register_addon()
+    timed(stages, 'bpy.setup', lambda: add_mesh_objects(names))
+
+    scene = bpy.context.scene
+    wm = bpy.context.window_manager
+    scene.texture_info_directory = os.path.join(fixture_root, "info")
+    scene.texture_directory = os.path.join(fixture_root, "textures")
+
+    timed(stages, 'bpy.load_textures', lambda: bpy.ops.texture.load_textures())
+    add_profile(stages, counts, 'bpy.load_textures', read_profile(wm.texture_loader_profile_path))
+    timed(stages, 'bpy.load_textures_unchanged', lambda: bpy.ops.texture.load_textures())
+    timed(stages, 'bpy.cleanup_and_replace', lambda: bpy.ops.material.cleanup_and_replace())
+    add_profile(stages, counts, 'bpy.cleanup_and_replace', read_profile(wm.texture_loader_profile_path))
+    counts['bpy.materials'] = len(bpy.data.materials)
+    counts['bpy.images'] = len(bpy.data.images)
+
+    # Material library: one import publishes, then a copy of the export in
+    # another folder, like a second map sharing assets, appends from it
+    copy_root = os.path.join(fixture_root, "library_copy")
+    for folder in ("info", "textures"):
+        shutil.copytree(os.path.join(fixture_root, folder), os.path.join(copy_root, folder))
+    scene.texture_loader_use_library = True
+    for name, root in (('publish', fixture_root), ('reuse', copy_root)):
+        bpy.data.batch_remove(list(bpy.data.objects) + list(bpy.data.meshes)
+                              + list(bpy.data.materials) + list(bpy.data.images))
+        scene.pop("texture_loader_manifest", None)
+        add_mesh_objects(names)
+        scene.texture_info_directory = os.path.join(root, "info")
+        scene.texture_directory = os.path.join(root, "textures")
+        timed(stages, f'bpy.library_{name}', lambda: bpy.ops.texture.load_textures())
+        add_profile(stages, counts, f'bpy.library_{name}', read_profile(wm.texture_loader_profile_path))
+    scene.texture_loader_use_library = False
+    return stages, counts
+
+
+def read_fixture_info(fixture_root):
+    with open(os.path.join(fixture_root, "fixture.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def spawn_bpy_stages(blender, fixture_root, cache_dir):
+    result_path = os.path.join(fixture_root, "bpy_result.json")
+    command = [blender, "-b", "--factory-startup", "--python", os.path.realpath(__file__), "--",
+               "--bpy-fixture", fixture_root, "--bpy-result", result_path]
+    env = dict(os.environ, TEXTURE_LOADER_CACHE=cache_dir)
+    process = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    result = read_profile(result_path)
+    if process.returncode != 0 or result is None:
+        print(process.stdout[-4000:])
+        return {}, {'bpy_failed': 1}, None
+    return result['stages'], result['counts'], result['blender']
+
+
+# Results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def merge_fastest(best, stages):
+    for name, seconds in stages.items():
+        if name not in best or seconds < best[name]:
+            best[name] = seconds
+
+
+def benchmark_size(args, materials):
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="texture_loader_benchmark_")
+    best = {}
+    counts = {}
+    blender_version = bpy.app.version_string if bpy else None
+    generate_seconds = None
+    for run in range(args.repeat):
+        root = os.path.join(work_dir, f"fixture_{materials}_{run}")
+        cache_dir = os.path.join(root, "cache")
+        shutil.rmtree(root, ignore_errors=True)
+        start = time.perf_counter()
+        fixture = generate_fixture(root, materials, args.textures, args.depth, args.seed)
+        generate_seconds = time.perf_counter() - start
+        texture_loader_core.write_json_atomic(os.path.join(root, "fixture.json"),
+                                              {key: fixture[key] for key in ('materials', 'textures')})
+
+        stages, counts = run_file_stages(fixture, cache_dir)
+        if not args.no_bpy:
+            if bpy is not None:
+                os.environ['TEXTURE_LOADER_CACHE'] = cache_dir
+                bpy_stages, bpy_counts = run_bpy_stages(root)
+            elif args.blender:
+                bpy_stages, bpy_counts, blender_version = spawn_bpy_stages(args.blender, root, cache_dir)
+            else:
+                bpy_stages, bpy_counts = {}, {}
+            stages.update(bpy_stages)
+            counts.update(bpy_counts)
+        merge_fastest(best, stages)
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    if not args.keep and not args.work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'materials': materials,
+        'textures': args.textures or 2 * materials,
+        'depth': args.depth,
+        'repeat': args.repeat,
+        'blender': blender_version,
+        'environment': environment(),
+        'generate_seconds': round(generate_seconds, 6),
+        'stages': {name: round(seconds, 6) for name, seconds in best.items()},
+        'counts': counts,
+    }
+
+
+def append_results(path, records):
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def read_results(path):
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                if record.get('version') == RESULTS_VERSION:
+                    records.append(record)
+    return records
+
+
+def print_record(record, baseline=None):
+    print(f"\n{record['materials']} materials, {record['textures']} textures "
+          f"(fixture generated in {record['generate_seconds']:.2f} s)")
+    for name, seconds in record['stages'].items():
+        per_material = 1e6 * seconds / record['materials']
+        line = f"  {name:<40} {seconds:10.4f} s {per_material:10.2f} us/material"
+        if baseline and baseline['stages'].get(name):
+            line += f" {seconds / baseline['stages'][name]:8.2f}x"
+        print(line)
+
+
+def main():
+    args = parse_args(script_args())
+
+    if args.bpy_fixture:
+        # Inside the Blender started by spawn_bpy_stages
+        stages, counts = run_bpy_stages(args.bpy_fixture)
+        texture_loader_core.write_json_atomic(args.bpy_result, {'stages': stages, 'counts': counts,
+                                                                'blender': bpy.app.version_string})
+        return
+
+    baselines = {}
+    if args.compare:
+        # The latest record of each size is the baseline
+        for record in read_results(args.compare):
+            baselines[record['materials']] = record
+
+    records = []
+    for materials in args.materials:
+        record = benchmark_size(args, materials)
+        records.append(record)
+        print_record(record, baselines.get(materials))
+    append_results(args.output, records)
+    print(f"\nResults appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1669 @@
+# File-side helpers for the Texture Loader add-on.
+# Nothing in here imports bpy, so it can be used and timed outside Blender.
+
+import os
+import re
+import sys
+import csv
+import json
+import mmap
+import time
+import bisect
+import struct
+import shutil
+import hashlib
+import tempfile
+import threading
+import uuid
+import importlib.util
+from array import array
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+
+INDEX_VERSION = 1
+
+# Coarsest directory mtime resolution we expect to meet (FAT/exFAT, some SMB
+# mounts). A listing scanned within this window of the directory's mtime may
+# have missed a change made in the same tick, so it is not trusted.
+MTIME_GRANULARITY = 2.0
+
+INFO_EXTENSIONS = ('.txt', '.mtl')
+TEXTURE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tga')
+
+
+def default_cache_dir():
+    cache_dir = os.environ.get("TEXTURE_LOADER_CACHE")
+    if cache_dir:
+        return cache_dir
+    return os.path.join(os.path.expanduser("~"), ".texture_loader_cache")
+
+
+def run_steps(steps):
+    # Runs a generator that yields progress to the end and returns its result
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+def map_in_batches(func, items, workers, batch_size):
+    # Generator: yields (done, total) after every batch, returns the results
+    results = []
+    if workers > 1 and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i in range(0, len(items), batch_size):
+                results.extend(executor.map(func, items[i:i + batch_size]))
+                yield len(results), len(items)
+    else:
+        for i in range(0, len(items), batch_size):
+            results.extend(map(func, items[i:i + batch_size]))
+            yield len(results), len(items)
+    return results
+
+
+def write_json_atomic(path, data):
+    # Each writer gets its own temp file, so concurrent writers never mix
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path, timeout=30.0, stale_after=120.0):
+    # Cross-process lock held by creating path exclusively. A lock file older
+    # than stale_after is left over from a crashed process and is broken.
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > stale_after:
+                    os.remove(path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {path}")
+            time.sleep(0.05)
+    try:
+        try:
+            os.write(fd, str(os.getpid()).encode('ascii'))
+        finally:
+            os.close(fd)
+        yield
+    finally:
+        os.remove(path)
+
+
+def scan_directory(path):
+    files = {}
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(entry.name)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = [stat.st_size, stat.st_mtime]
+            except OSError:
+                continue
+    subdirs.sort()
+    return files, subdirs
+
+
+class DirectoryIndex:
+    # Persistent basename -> (path, size, mtime) index of one directory tree.
+    # A directory's mtime only changes when entries are added, removed or
+    # renamed in it, so unchanged directories keep their cached listing
+    # unless it was scanned too close to that mtime to be sure it is complete.
+
+    def __init__(self, root, cache_dir=None):
+        self.root = os.path.normpath(os.path.abspath(root))
+        self.cache_dir = cache_dir or default_cache_dir()
+        key = hashlib.sha1(os.path.normcase(self.root).encode('utf-8')).hexdigest()[:16]
+        self.cache_path = os.path.join(self.cache_dir, "index_" + key + ".json")
+        self.dirs = {}
+        self.rescanned_dirs = 0
+        self.reused_dirs = 0
+        self.changed = False
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != INDEX_VERSION or data.get('root') != self.root:
+            return False
+        self.dirs = data.get('dirs', {})
+        return True
+
+    def save(self):
+        data = {'version': INDEX_VERSION, 'root': self.root, 'dirs': self.dirs}
+        try:
+            write_json_atomic(self.cache_path, data)
+        except OSError:
+            return False
+        return True
+
+    def refresh(self):
+        old_dirs = self.dirs
+        new_dirs = {}
+        self.rescanned_dirs = 0
+        self.reused_dirs = 0
+
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            full_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            try:
+                dir_mtime = os.stat(full_dir).st_mtime
+            except OSError:
+                continue
+
+            cached = old_dirs.get(rel_dir)
+            if (cached is not None and cached['mtime'] == dir_mtime
+                    and cached.get('scanned', 0) - dir_mtime > MTIME_GRANULARITY):
+                entry = cached
+                self.reused_dirs += 1
+            else:
+                scanned = time.time()
+                try:
+                    files, subdirs = scan_directory(full_dir)
+                except OSError:
+                    continue
+                entry = {'mtime': dir_mtime, 'scanned': scanned, 'files': files, 'subdirs': subdirs}
+                self.rescanned_dirs += 1
+
+            new_dirs[rel_dir] = entry
+            for subdir in reversed(entry['subdirs']):
+                pending.append(os.path.join(rel_dir, subdir) if rel_dir else subdir)
+
+        self.changed = self.rescanned_dirs > 0 or len(new_dirs) != len(old_dirs)
+        self.dirs = new_dirs
+        return self
+
+    def update(self):
+        self.load()
+        self.refresh()
+        if self.changed:
+            self.save()
+        return self
+
+    def iter_files(self, extensions=None):
+        if extensions is not None:
+            extensions = frozenset(ext.lower() for ext in extensions)
+        for rel_dir in sorted(self.dirs):
+            full_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            for name, (size, mtime) in sorted(self.dirs[rel_dir]['files'].items()):
+                if extensions is None or os.path.splitext(name)[1].lower() in extensions:
+                    yield name, os.path.join(full_dir, name), size, mtime
+
+    def find_files(self, extensions):
+        return [path for name, path, size, mtime in self.iter_files(extensions)]
+
+    def file_map(self, extensions):
+        # First match wins; every other path with the same basename is
+        # reported in collisions instead of silently replacing it.
+        files_map = {}
+        collisions = {}
+        for name, path, size, mtime in self.iter_files(extensions):
+            if name in files_map:
+                collisions.setdefault(name, [files_map[name]]).append(path)
+            else:
+                files_map[name] = path
+        return files_map, collisions
+
+
+# (semantic, Principled BSDF input, node location) in the order nodes are built
+TEXTURE_SLOTS = (
+    ('colorMap', 'Base Color', (-600, 600)),
+    ('specularMap', 'Specular', (-600, 0)),
+    ('normalMap', 'Normal', (-600, -600)),
+    ('unk_semantic_0xB60D1850', 'Metallic', (-500, 300)),
+    ('unk_semantic_0xCFE18444', 'Roughness', (-500, -300)),
+)
+
+
+def add_file_extension(filename):
+    if not os.path.splitext(filename)[1]:
+        return filename + ".png"
+    return filename
+
+
+SLOT_SEMANTICS = frozenset(semantic for semantic, input_name, location in TEXTURE_SLOTS)
+INPUT_SLOTS = {input_name: semantic for semantic, input_name, location in TEXTURE_SLOTS}
+
+UNKNOWN_SEMANTIC_PREFIX = 'unk_semantic_0x'
+
+# Which shader input a semantic feeds: "hashes" maps the hex part of an
+# unk_semantic_0x... key, "names" maps semantic names, either read straight
+# from the info file or resolved from a hash through a semantic table.
+SEMANTIC_INPUTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_inputs.json")
+
+
+def load_semantic_inputs(path=SEMANTIC_INPUTS_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return ({int(key, 16): input_name for key, input_name in data.get('hashes', {}).items()},
+            dict(data.get('names', {})))
+
+
+SEMANTIC_HASH_INPUTS, SEMANTIC_NAME_INPUTS = load_semantic_inputs()
+
+
+def slot_semantic(semantic, resolver=None):
+    if semantic in SLOT_SEMANTICS:
+        return semantic
+    input_name = SEMANTIC_NAME_INPUTS.get(semantic)
+    if input_name is None and semantic.startswith(UNKNOWN_SEMANTIC_PREFIX):
+        try:
+            hash_value = int(semantic[len(UNKNOWN_SEMANTIC_PREFIX):], 16)
+        except ValueError:
+            return None
+        input_name = SEMANTIC_HASH_INPUTS.get(hash_value)
+        if input_name is None and resolver is not None:
+            input_name = SEMANTIC_NAME_INPUTS.get(resolver.lookup_semantic(hash_value))
+    return INPUT_SLOTS.get(input_name)
+
+
+def resolve_texture_slots(texture_info, texture_files_map, slots=TEXTURE_SLOTS, resolver=None):
+    # Returns ([(semantic, image_name, texture_path)], [missing image names])
+    slot_images = {}
+    for semantic, image in texture_info.items():
+        # A semantic naming a slot directly beats one reached through an alias
+        target = slot_semantic(semantic, resolver)
+        if target is not None and (target not in slot_images or semantic == target):
+            slot_images[target] = image
+
+    resolved = []
+    missing = []
+    for semantic, input_name, location in slots:
+        if semantic not in slot_images:
+            continue
+        image_name = add_file_extension(slot_images[semantic])
+        texture_path = texture_files_map.get(image_name)
+        if not texture_path and resolver is not None:
+            real_name = resolver.resolve_image_name(slot_images[semantic])
+            if real_name:
+                texture_path = texture_files_map.get(add_file_extension(real_name))
+                if texture_path:
+                    image_name = add_file_extension(real_name)
+        if texture_path:
+            resolved.append((semantic, image_name, texture_path))
+        else:
+            missing.append(image_name)
+    return resolved, missing
+
+
+def material_layout(resolved):
+    return tuple(semantic for semantic, image_name, texture_path in resolved)
+
+
+def material_key(resolved):
+    # Materials with the same key use the same images in the same slots
+    return tuple((semantic, os.path.normcase(texture_path)) for semantic, image_name, texture_path in resolved)
+
+
+def split_numeric_suffix(name):
+    # "name.001" -> ("name", "001"), anything else -> (name, "")
+    base_name, dot, suffix = name.rpartition(".")
+    if dot and suffix.isdigit():
+        return base_name, suffix
+    return name, ""
+
+
+def object_name_keys(name):
+    # Material names an object can match: its own name, the "::" -> "_" form
+    # written by the exporters, and both again without a ".001"-style suffix.
+    keys = [name]
+    normalized = name.replace("::", "_")
+    if normalized != name:
+        keys.append(normalized)
+    for key in list(keys):
+        base_name, suffix = split_numeric_suffix(key)
+        if suffix and base_name not in keys:
+            keys.append(base_name)
+    return keys
+
+
+def build_name_index(items, name_getter=None):
+    index = {}
+    for item in items:
+        name = name_getter(item) if name_getter else item
+        for key in object_name_keys(name):
+            index.setdefault(key, []).append(item)
+    return index
+
+
+def geometry_key(buffers, extra=()):
+    # Buffers are length-prefixed so different splits of the same bytes differ
+    digest = hashlib.blake2b(digest_size=16)
+    for buffer in buffers:
+        data = memoryview(buffer).cast('B')
+        digest.update(struct.pack('<Q', len(data)))
+        digest.update(data)
+    for item in extra:
+        encoded = item.encode('utf-8')
+        digest.update(struct.pack('<Q', len(encoded)))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+# Texture info parsing
+
+def material_name_from_path(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def parse_texture_info_text(text):
+    # C2M/Grayhound info files have a header line, then "semantic,image" rows.
+    texture_info = {}
+    for line in text.splitlines()[1:]:
+        parts = line.strip().split(',', 2)
+        if len(parts) < 2:
+            continue
+        texture_info[sys.intern(parts[0])] = parts[1]
+    return texture_info
+
+
+def parse_texture_info(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return parse_texture_info_text(data.decode('utf-8', errors='replace')), hashlib.sha1(data).hexdigest()
+
+
+def _parse_texture_info_chunk(paths):
+    results = []
+    for path in paths:
+        try:
+            texture_info, digest = parse_texture_info(path)
+            results.append((path, texture_info, digest, None))
+        except OSError as e:
+            results.append((path, None, None, str(e)))
+    return results
+
+
+def parse_texture_info_files(paths, workers=1, use_processes=False, chunk_size=64):
+    # Returns ({material_name: {semantic: image}}, {material_name: (path, sha1)},
+    # {path: error}). Materials keep the order of paths; a later file with the
+    # same material name wins. Parsing holds the GIL, so it is serial unless
+    # workers is given: threads only help when reads block (cold or network
+    # drives), processes only from plain Python since Blender cannot spawn
+    # itself as a worker.
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+    if len(chunks) <= 1 or workers <= 1:
+        chunk_results = [_parse_texture_info_chunk(chunk) for chunk in chunks]
+    else:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            chunk_results = list(executor.map(_parse_texture_info_chunk, chunks))
+
+    materials = {}
+    sources = {}
+    errors = {}
+    for results in chunk_results:
+        for path, texture_info, digest, error in results:
+            if error is not None:
+                errors[path] = error
+                continue
+            material_name = material_name_from_path(path)
+            materials[material_name] = texture_info
+            sources[material_name] = (path, digest)
+    return materials, sources, errors
+
+
+# Incremental re-import manifest
+
+MANIFEST_VERSION = 1
+
+
+class ImportManifest:
+    # Inputs each material was last built from: the info file hash and the
+    # path, size and mtime of every resolved texture. Stored as JSON text so
+    # it can live in a scene property or next to the export.
+
+    def __init__(self, options=None, entries=None):
+        self.options = options or {}
+        self.entries = entries or {}
+        self._stat_cache = {}
+
+    @classmethod
+    def from_json(cls, text, options=None):
+        try:
+            data = json.loads(text) if text else {}
+        except ValueError:
+            data = {}
+        # Entries built with other options or by another version are stale
+        if data.get('version') != MANIFEST_VERSION or data.get('options') != (options or {}):
+            return cls(options)
+        return cls(options, data.get('entries', {}))
+
+    def to_json(self):
+        return json.dumps({'version': MANIFEST_VERSION, 'options': self.options, 'entries': self.entries},
+                          separators=(',', ':'))
+
+    def texture_stat(self, texture_path):
+        stat = self._stat_cache.get(texture_path)
+        if stat is None:
+            try:
+                st = os.stat(texture_path)
+                stat = [st.st_size, st.st_mtime]
+            except OSError:
+                stat = [-1, -1]
+            self._stat_cache[texture_path] = stat
+        return stat
+
+    def make_entry(self, info_digest, resolved):
+        textures = [[semantic, texture_path] + self.texture_stat(texture_path)
+                    for semantic, image_name, texture_path in resolved]
+        return {'info': info_digest, 'textures': textures}
+
+    def unchanged_material(self, material_name, entry):
+        # Returns the name of the material built from identical inputs, or None
+        old_entry = self.entries.get(material_name)
+        if old_entry is None:
+            return None
+        if old_entry['info'] != entry['info'] or old_entry['textures'] != entry['textures']:
+            return None
+        return old_entry.get('material', material_name)
+
+    def record(self, material_name, entry, built_material_name):
+        entry = dict(entry)
+        entry['material'] = built_material_name
+        self.entries[material_name] = entry
+
+
+# Texture prefetch
+
+class TexturePrefetcher:
+    # Reads texture files in plan order on worker threads so they are in the
+    # OS page cache by the time Blender loads them. Workers stay at most
+    # `lookahead` files ahead of the consumer, which keeps the read-ahead from
+    # evicting files that have not been used yet; each worker reuses one
+    # buffer, so memory use stays at workers * buffer_size.
+
+    def __init__(self, paths, workers=4, lookahead=64, buffer_size=1 << 20):
+        self.paths = list(dict.fromkeys(paths))
+        self.positions = {path: i for i, path in enumerate(self.paths)}
+        self.workers = workers
+        self.lookahead = lookahead
+        self.buffer_size = buffer_size
+        self.files_read = 0
+        self.bytes_read = 0
+        self.errors = 0
+        self._next = 0
+        self._consumed = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def start(self):
+        for i in range(min(self.workers, len(self.paths))):
+            thread = threading.Thread(target=self._run, name=f"TexturePrefetch-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def consumed(self, path):
+        position = self.positions.get(path)
+        if position is None:
+            return
+        with self._condition:
+            if position + 1 > self._consumed:
+                self._consumed = position + 1
+                self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _take(self):
+        with self._condition:
+            while not self._stopped and self._next < len(self.paths) and self._next >= self._consumed + self.lookahead:
+                self._condition.wait()
+            if self._stopped or self._next >= len(self.paths):
+                return None
+            # Files the consumer already passed are not worth reading any more
+            self._next = max(self._next, self._consumed)
+            if self._next >= len(self.paths):
+                return None
+            path = self.paths[self._next]
+            self._next += 1
+            return path
+
+    def _run(self):
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        while True:
+            path = self._take()
+            if path is None:
+                return
+            size = 0
+            try:
+                with open(path, 'rb', buffering=0) as f:
+                    while not self._stopped:
+                        n = f.readinto(view)
+                        if not n:
+                            break
+                        size += n
+            except OSError:
+                with self._condition:
+                    self.errors += 1
+                continue
+            with self._condition:
+                self.files_read += 1
+                self.bytes_read += size
+
+
+# Content-addressed texture dedup
+
+CONTENT_HASH_VERSION = 1
+
+
+class ContentHashCache:
+    # Maps texture files with identical bytes to one canonical path. Files are
+    # grouped by size first, so only files sharing a size are ever hashed;
+    # hashes are cached on disk by path, size and mtime.
+
+    def __init__(self, cache_dir=None):
+        self.cache_path = os.path.join(cache_dir or default_cache_dir(), "content_hashes.json")
+        self.hashes = {}
+        self.hashed_files = 0
+        self.cached_files = 0
+        self.changed = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != CONTENT_HASH_VERSION:
+            return False
+        self.hashes = data.get('hashes', {})
+        return True
+
+    def save(self):
+        try:
+            write_json_atomic(self.cache_path, {'version': CONTENT_HASH_VERSION, 'hashes': self.hashes})
+        except OSError:
+            return False
+        return True
+
+    def file_hash(self, path, size, mtime):
+        cached = self.hashes.get(path)
+        if cached is not None and cached[0] == size and cached[1] == mtime:
+            with self._lock:
+                self.cached_files += 1
+            return cached[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        value = digest.hexdigest()
+        with self._lock:
+            self.hashes[path] = [size, mtime, value]
+            self.hashed_files += 1
+            self.changed = True
+        return value
+
+    def canonical_paths(self, paths, workers=4):
+        # Returns {path: canonical_path}; the first path with given content wins
+        return run_steps(self.canonical_paths_steps(paths, workers))
+
+    def canonical_paths_steps(self, paths, workers=4, batch_size=256):
+        # canonical_paths as a generator yielding (hashed, to hash) per batch
+        paths = list(dict.fromkeys(paths))
+        stats = {}
+        by_size = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_size, st.st_mtime)
+            by_size.setdefault(st.st_size, []).append(path)
+
+        to_hash = [path for group in by_size.values() if len(group) > 1 for path in group]
+
+        def hash_one(path):
+            try:
+                return path, self.file_hash(path, *stats[path])
+            except OSError:
+                return path, None
+
+        hashes = dict((yield from map_in_batches(hash_one, to_hash, workers, batch_size)))
+
+        canonical = {}
+        first_by_content = {}
+        for path in paths:
+            if path not in stats:
+                canonical[path] = path
+                continue
+            content_hash = hashes.get(path)
+            if content_hash is None:
+                canonical[path] = path
+                continue
+            content_key = (stats[path][0], content_hash)
+            canonical[path] = first_by_content.setdefault(content_key, path)
+        return canonical
+
+    def update(self, paths, workers=4):
+        return run_steps(self.update_steps(paths, workers))
+
+    def update_steps(self, paths, workers=4):
+        self.load()
+        canonical = yield from self.canonical_paths_steps(paths, workers)
+        if self.changed:
+            self.save()
+        return canonical
+
+
+def dedup_resolved(resolved, canonical):
+    # Point every slot at the canonical copy of its texture
+    deduped = []
+    for semantic, image_name, texture_path in resolved:
+        canonical_path = canonical.get(texture_path, texture_path)
+        if canonical_path != texture_path:
+            image_name = os.path.basename(canonical_path)
+        deduped.append((semantic, image_name, canonical_path))
+    return deduped
+
+
+# package_index .wni hash -> name tables
+
+WNI_MAGIC = b'WNI '
+HASH_TABLE_MAGIC = b'TLHT'
+HASH_TABLE_VERSION = 1
+HASH_MASK_60 = 0x0FFFFFFFFFFFFFFF
+HASHED_IMAGE_PREFIXES = ('ximage_', '0x')
+# Tables are picked by file name: image names only come from the ximage
+# tables, semantic names only from a table with "semantic" in its name.
+# The package_index shipped with C2M has no semantic table.
+IMAGE_TABLE_KEYWORD = 'ximage'
+SEMANTIC_TABLE_KEYWORD = 'semantic'
+
+
+def lz4_block_decompress(src, size):
+    try:
+        import lz4.block
+        return lz4.block.decompress(src, uncompressed_size=size)
+    except ImportError:
+        pass
+
+    out = bytearray()
+    i = 0
+    n = len(src)
+    while i < n:
+        token = src[i]
+        i += 1
+        literal_length = token >> 4
+        if literal_length == 15:
+            while True:
+                b = src[i]
+                i += 1
+                literal_length += b
+                if b != 255:
+                    break
+        out += src[i:i + literal_length]
+        i += literal_length
+        if i >= n:
+            break
+
+        offset = src[i] | (src[i + 1] << 8)
+        i += 2
+        match_length = token & 15
+        if match_length == 15:
+            while True:
+                b = src[i]
+                i += 1
+                match_length += b
+                if b != 255:
+                    break
+        match_length += 4
+        start = len(out) - offset
+        if offset >= match_length:
+            out += out[start:start + match_length]
+        else:
+            out += (out[start:] * (match_length // offset + 1))[:match_length]
+    if len(out) != size:
+        raise ValueError("Corrupt LZ4 block")
+    return bytes(out)
+
+
+def read_wni(path):
+    # Header: magic, u16 version, u32 entry count, u32 packed size,
+    # u32 unpacked size, then one LZ4 block of (u64 hash, C string) entries.
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, count, packed_size, unpacked_size = struct.unpack_from('<4sHIII', data, 0)
+    if magic != WNI_MAGIC:
+        raise ValueError(f"{path} is not a package index file")
+    raw = lz4_block_decompress(data[18:18 + packed_size], unpacked_size)
+
+    entries = {}
+    pos = 0
+    for _ in range(count):
+        (hash_value,) = struct.unpack_from('<Q', raw, pos)
+        end = raw.index(b'\0', pos + 8)
+        entries.setdefault(hash_value, raw[pos + 8:end])
+        pos = end + 1
+    return entries
+
+
+def write_hash_table(path, entries):
+    # Sorted u64 hashes, u32 string offsets and one string blob, all in
+    # native byte order so they can be used straight from a memory map.
+    hashes = array('Q', sorted(entries))
+    offsets = array('I', [0])
+    blob = bytearray()
+    for hash_value in hashes:
+        blob += entries[hash_value]
+        offsets.append(len(blob))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack('=4sIII', HASH_TABLE_MAGIC, HASH_TABLE_VERSION, len(hashes), 0))
+        hashes.tofile(f)
+        offsets.tofile(f)
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class HashTable:
+    # Memory-mapped view of a table written by write_hash_table
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, reserved = struct.unpack_from('=4sIII', self._mmap, 0)
+        if magic != HASH_TABLE_MAGIC or version != HASH_TABLE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a hash table cache")
+        view = memoryview(self._mmap)
+        hashes_start = 16
+        offsets_start = hashes_start + 8 * count
+        self._blob_start = offsets_start + 4 * (count + 1)
+        self.hashes = view[hashes_start:offsets_start].cast('Q')
+        self.offsets = view[offsets_start:self._blob_start].cast('I')
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def get(self, hash_value):
+        i = bisect.bisect_left(self.hashes, hash_value)
+        if i < len(self.hashes) and self.hashes[i] == hash_value:
+            start = self._blob_start + self.offsets[i]
+            end = self._blob_start + self.offsets[i + 1]
+            return self._mmap[start:end].decode('utf-8', errors='replace')
+        return None
+
+
+class HashNameResolver:
+    # Resolves hashes through the .wni files of a package_index folder. Each
+    # file is decoded once into a sorted cache file, keyed by its path, size
+    # and mtime, and memory-mapped on first use.
+
+    def __init__(self, package_index_dir, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        try:
+            names = sorted(name for name in os.listdir(package_index_dir) if name.lower().endswith('.wni'))
+        except OSError:
+            names = []
+        self.wni_paths = [os.path.join(package_index_dir, name) for name in names]
+        self._tables = {}
+        self._memo = {}
+
+    def cache_path(self, wni_path):
+        st = os.stat(wni_path)
+        key = f"{os.path.abspath(wni_path)}|{st.st_size}|{st.st_mtime}"
+        return os.path.join(self.cache_dir, "hashes_" + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + ".bin")
+
+    def tables(self, keyword):
+        # Only the tables whose file name contains keyword
+        if keyword not in self._tables:
+            tables = []
+            for wni_path in self.wni_paths:
+                if keyword not in os.path.basename(wni_path).lower():
+                    continue
+                try:
+                    cache_path = self.cache_path(wni_path)
+                    if not os.path.exists(cache_path):
+                        write_hash_table(cache_path, read_wni(wni_path))
+                    tables.append(HashTable(cache_path))
+                except (OSError, ValueError, struct.error):
+                    continue
+            self._tables[keyword] = tables
+        return self._tables[keyword]
+
+    def lookup(self, hash_value, keyword):
+        memo_key = (keyword, hash_value)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        name = None
+        for table in self.tables(keyword):
+            name = table.get(hash_value)
+            if name is None and hash_value > HASH_MASK_60:
+                name = table.get(hash_value & HASH_MASK_60)
+            if name is not None:
+                break
+        self._memo[memo_key] = name
+        return name
+
+    def lookup_semantic(self, hash_value):
+        return self.lookup(hash_value, SEMANTIC_TABLE_KEYWORD)
+
+    def resolve_image_name(self, image_name):
+        # "ximage_1a2b3c" or "0x1a2b3c" -> real image name, when it is known
+        name = os.path.splitext(image_name)[0]
+        for prefix in HASHED_IMAGE_PREFIXES:
+            if name.lower().startswith(prefix):
+                try:
+                    hash_value = int(name[len(prefix):], 16)
+                except ValueError:
+                    return None
+                return self.lookup(hash_value, IMAGE_TABLE_KEYWORD)
+        return None
+
+
+# File normalization
+
+IMAGES_SUFFIX = '_images'
+SPECIAL_CHARACTERS = ('~', '&', '$')
+NORMALIZE_JOURNAL = '.texture_loader_normalize.journal'
+NORMALIZE_BACKUP_DIR = '.texture_loader_normalize_backup'
+NORMALIZE_TEXTURE_EXTENSIONS = ('.png', '.dds', '.tga', '.tiff', '.tif', '.jpg', '.jpeg', '.bmp')
+# Normalization steps are applied and fsynced in batches of this many, and at
+# the end of every directory
+JOURNAL_SYNC_STEPS = 256
+
+
+def replace_special_characters(text):
+    for char in SPECIAL_CHARACTERS:
+        text = text.replace(char, '_')
+    return text
+
+
+def strip_images_suffix(filename):
+    base, ext = os.path.splitext(filename)
+    if ext.lower() in INFO_EXTENSIONS and base.endswith(IMAGES_SUFFIX):
+        return base[:-len(IMAGES_SUFFIX)] + ext
+    return filename
+
+
+def rollback_normalization(root):
+    # Undo every journaled step of an interrupted run, newest first
+    journal_path = os.path.join(root, NORMALIZE_JOURNAL)
+    if not os.path.exists(journal_path):
+        return 0
+    steps = []
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                steps.append(json.loads(line))
+            except ValueError:
+                break
+    undone = 0
+    for step in reversed(steps):
+        try:
+            if step['op'] == 'rename':
+                if os.path.exists(step['dst']) and not os.path.exists(step['src']):
+                    os.rename(step['dst'], step['src'])
+                    undone += 1
+            elif step['op'] == 'rewrite':
+                if os.path.exists(step['backup']):
+                    os.replace(step['backup'], step['path'])
+                    undone += 1
+                if 'tmp' in step and os.path.exists(step['tmp']):
+                    os.remove(step['tmp'])
+        except OSError:
+            continue
+    _remove_journal(root)
+    return undone
+
+
+def _remove_journal(root):
+    backup_dir = os.path.join(root, NORMALIZE_BACKUP_DIR)
+    if os.path.isdir(backup_dir):
+        for name in os.listdir(backup_dir):
+            os.remove(os.path.join(backup_dir, name))
+        os.rmdir(backup_dir)
+    journal_path = os.path.join(root, NORMALIZE_JOURNAL)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def fsync_directory(path):
+    # Makes renames and new entries in path durable. Not possible on Windows,
+    # where directories cannot be opened.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Journal:
+    # Steps are fsynced in batches. Before a batch of rewrites replaces any
+    # file, sync() makes their backups and records durable, since losing
+    # either would lose the original content. A rename whose record is lost
+    # in a crash is just left applied, which a rerun keeps as it is.
+
+    def __init__(self, root):
+        self.root = root
+        self.backup_dir = os.path.join(root, NORMALIZE_BACKUP_DIR)
+        self._file = None
+        self._backups = 0
+        self._unsynced = 0
+        self._unsynced_copies = []
+        self._unsynced_backups = False
+
+    def record(self, step):
+        if self._file is None:
+            self._file = open(os.path.join(self.root, NORMALIZE_JOURNAL), 'a', encoding='utf-8')
+            fsync_directory(self.root)
+        self._file.write(json.dumps(step) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+
+    def sync(self):
+        if not self._unsynced:
+            return
+        for backup_path in self._unsynced_copies:
+            with open(backup_path, 'r+b') as f:
+                os.fsync(f.fileno())
+        self._unsynced_copies = []
+        if self._unsynced_backups:
+            fsync_directory(self.backup_dir)
+            self._unsynced_backups = False
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def backup(self, path):
+        if not os.path.isdir(self.backup_dir):
+            os.makedirs(self.backup_dir)
+            fsync_directory(self.root)
+        self._backups += 1
+        backup_path = os.path.join(self.backup_dir, f"{self._backups}.bak")
+        self._unsynced_backups = True
+        try:
+            os.link(path, backup_path)
+        except OSError:
+            shutil.copy2(path, backup_path)
+            self._unsynced_copies.append(backup_path)
+        return backup_path
+
+    def abandon(self):
+        # Keeps the journal and backups so the next run can roll back
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.abandon()
+        _remove_journal(self.root)
+
+
+class _NormalizeBatch:
+    # Rewrites and renames staged for one directory. Rewrites are written to
+    # a temp file and journaled first, then apply() syncs the journal once
+    # and replaces the files before doing the renames.
+
+    def __init__(self, journal, stats):
+        self.journal = journal
+        self.stats = stats
+        self.rewrites = []
+        self.renames = []
+
+    def __len__(self):
+        return len(self.rewrites) + len(self.renames)
+
+    def stage_rewrite(self, path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        backup_path = self.journal.backup(path)
+        self.journal.record({'op': 'rewrite', 'path': path, 'backup': backup_path, 'tmp': tmp_path})
+        self.rewrites.append((tmp_path, path))
+
+    def stage_rename(self, src, dst, counter):
+        self.renames.append((src, dst, counter))
+
+    def apply(self):
+        self.journal.sync()
+        for tmp_path, path in self.rewrites:
+            try:
+                os.replace(tmp_path, path)
+                self.stats['rewritten'] += 1
+            except OSError as e:
+                self.stats['errors'].append(f"{path}: {e}")
+        for src, dst, counter in self.renames:
+            try:
+                self.journal.record({'op': 'rename', 'src': src, 'dst': dst})
+                os.rename(src, dst)
+                self.stats[counter] += 1
+            except OSError as e:
+                self.stats['errors'].append(f"{src}: {e}")
+        self.rewrites = []
+        self.renames = []
+
+
+def normalize_tree(root, strip_suffix=True, rename_textures=True, rewrite_info=True):
+    # One walk that strips "_images" from info file names, replaces special
+    # characters in texture file names and in info file contents. Only files
+    # that actually change are written; every step is journaled so an
+    # interrupted run is rolled back by the next one.
+    root = os.path.normpath(root)
+    if not os.path.isdir(root):
+        root = os.path.dirname(root)
+    stats = {'rolled_back': rollback_normalization(root), 'renamed_info': 0, 'renamed_textures': 0,
+             'rewritten': 0, 'unchanged': 0, 'conflicts': [], 'errors': []}
+    journal = _Journal(root)
+    batch = _NormalizeBatch(journal, stats)
+    texture_extensions = frozenset(NORMALIZE_TEXTURE_EXTENSIONS)
+    try:
+        for dirpath, dirnames, filenames in os.walk(root):
+            if dirpath == root:
+                dirnames[:] = [d for d in dirnames if d != NORMALIZE_BACKUP_DIR]
+            existing = set(filenames)
+            for filename in filenames:
+                if dirpath == root and filename == NORMALIZE_JOURNAL:
+                    continue
+                ext = os.path.splitext(filename)[1].lower()
+                path = os.path.join(dirpath, filename)
+                changed = False
+                try:
+                    if ext in INFO_EXTENSIONS:
+                        if rewrite_info:
+                            with open(path, 'rb') as f:
+                                data = f.read()
+                            new_data = replace_special_characters(data.decode('utf-8')).encode('utf-8')
+                            if new_data != data:
+                                batch.stage_rewrite(path, new_data)
+                                changed = True
+                        new_filename = strip_images_suffix(filename) if strip_suffix else filename
+                        counter = 'renamed_info'
+                    elif ext in texture_extensions and rename_textures:
+                        new_filename = replace_special_characters(filename)
+                        counter = 'renamed_textures'
+                    else:
+                        continue
+
+                    if new_filename != filename:
+                        if new_filename in existing:
+                            stats['conflicts'].append(path)
+                            continue
+                        batch.stage_rename(path, os.path.join(dirpath, new_filename), counter)
+                        existing.discard(filename)
+                        existing.add(new_filename)
+                        changed = True
+                except (OSError, UnicodeDecodeError) as e:
+                    stats['errors'].append(f"{path}: {e}")
+                    continue
+                if not changed:
+                    stats['unchanged'] += 1
+                if len(batch) >= JOURNAL_SYNC_STEPS:
+                    batch.apply()
+            batch.apply()
+        journal.sync()
+    except BaseException:
+        journal.abandon()
+        raise
+    journal.close()
+    return stats
+
+
+# Material / texture / mesh mapping export
+
+class MappingWriter:
+    # Streams one record per material to a JSON Lines file (or CSV when the
+    # path ends in .csv) and collects texture -> materials and
+    # mesh -> materials, which close() appends together with the counts.
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.lower().endswith('.csv')
+        self.texture_materials = {}
+        self.mesh_materials = {}
+        self.material_count = 0
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        if self.csv:
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(['type', 'name', 'relation', 'target'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def _record(self, record_type, name, **fields):
+        if self.csv:
+            for relation, targets in fields.items():
+                if isinstance(targets, list):
+                    for target in targets:
+                        self._writer.writerow([record_type, name, relation, target])
+                else:
+                    self._writer.writerow([record_type, name, relation, targets])
+        else:
+            record = {'type': record_type, 'name': name}
+            record.update(fields)
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def write_material(self, material_name, textures, meshes):
+        self.material_count += 1
+        self._record('material', material_name, textures=textures, meshes=meshes)
+        for texture in set(textures):
+            self.texture_materials.setdefault(texture, []).append(material_name)
+        for mesh in set(meshes):
+            self.mesh_materials.setdefault(mesh, []).append(material_name)
+
+    def close(self):
+        for texture, materials in self.texture_materials.items():
+            self._record('texture', texture, materials=materials, count=len(materials))
+        for mesh, materials in self.mesh_materials.items():
+            self._record('mesh', mesh, materials=materials, count=len(materials))
+        self._record('summary', 'counts', materials=self.material_count,
+                     textures=len(self.texture_materials), meshes=len(self.mesh_materials))
+        self._file.close()
+
+
+# Streaming JSON name extraction
+
+_JSON_SPACE = re.compile(r'[ \t\n\r]*')
+_JSON_DECODER = json.JSONDecoder()
+
+
+def iter_json_names(path, key='Name', default='Unnamed', chunk_size=1 << 20):
+    # Yields item.get(key, default) for every item of the top-level object,
+    # like json.load(f).values(), but only one item is decoded and held in
+    # memory at a time. Non-string values count as missing.
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+        pos = _JSON_SPACE.match(buf).end()
+        if buf[pos:pos + 1] != '{':
+            raise ValueError(f"{path} does not contain a JSON object")
+        pos += 1
+        expect_key = True
+        while True:
+            pos = _JSON_SPACE.match(buf, pos).end()
+            if pos >= len(buf) - 1 and not eof:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            char = buf[pos:pos + 1]
+            if char == '}' or not char:
+                return
+            if char == ',':
+                pos += 1
+                expect_key = True
+                continue
+            try:
+                if not expect_key:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                item_key, colon = _JSON_DECODER.raw_decode(buf, pos)
+                colon = _JSON_SPACE.match(buf, colon).end()
+                if buf[colon:colon + 1] != ':':
+                    raise json.JSONDecodeError("Expecting ':' delimiter", buf, colon)
+                start = _JSON_SPACE.match(buf, colon + 1).end()
+                item, end = _JSON_DECODER.raw_decode(buf, start)
+                if not eof and buf[start:start + 1] not in ('{', '[', '"'):
+                    # A number or literal is only complete once the delimiter
+                    # after it is in the buffer: "1" may be "1.5" split in two
+                    after = _JSON_SPACE.match(buf, end).end()
+                    if after >= len(buf) or buf[after] not in ',}':
+                        raise json.JSONDecodeError("Value may be truncated", buf, end)
+            except json.JSONDecodeError:
+                # Most likely the item continues in the next chunk
+                if eof:
+                    raise
+                chunk = f.read(max(chunk_size, len(buf) - pos))
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            pos = end
+            expect_key = False
+            value = item.get(key, default) if isinstance(item, dict) else default
+            yield value if isinstance(value, str) else default
+
+
+def build_name_lookup(names, info_files):
+    # {material name: info file} for the names that have an info file
+    wanted = set(names)
+    lookup = {}
+    for path in info_files:
+        material_name = material_name_from_path(path)
+        if material_name in wanted:
+            lookup.setdefault(material_name, path)
+    return lookup
+
+
+def read_names_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+
+# Material library cache
+
+LIBRARY_VERSION = 2
+
+
+def material_input_hash(manifest_entry):
+    # Every export has its own texture folder, so textures are keyed by file
+    # name and size rather than by path
+    textures = [[semantic, os.path.basename(texture_path).lower(), size]
+                for semantic, texture_path, size, mtime in manifest_entry['textures']]
+    data = json.dumps([LIBRARY_VERSION, manifest_entry['info'], textures], separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:20]
+
+
+# A .blend no catalog entry refers to is only deleted once it is this old,
+# so a file another process is about to publish is left alone
+LIBRARY_ORPHAN_AGE = 3600
+
+
+class MaterialLibrary:
+    # On-disk catalog of built materials keyed by material name plus a hash
+    # of its inputs. Each import writes the materials it built to one .blend;
+    # files are evicted least recently used first once the library grows
+    # past its size limit. Processes sharing a library update the catalog
+    # under a lock file.
+
+    def __init__(self, library_dir=None, size_limit=2 << 30):
+        self.library_dir = library_dir or os.path.join(default_cache_dir(), "material_library")
+        self.catalog_path = os.path.join(self.library_dir, "catalog.json")
+        self.lock_path = os.path.join(self.library_dir, "catalog.lock")
+        self.size_limit = size_limit
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def load(self):
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != LIBRARY_VERSION:
+            return False
+        self.entries = data.get('entries', {})
+        return True
+
+    def save(self):
+        # Under the lock: merge with entries other processes published since
+        # this one loaded, drop entries whose .blend is gone, evict and write
+        own_entries = self.entries
+        try:
+            os.makedirs(self.library_dir, exist_ok=True)
+            with file_lock(self.lock_path):
+                self.entries = {}
+                self.load()
+                for key, entry in own_entries.items():
+                    current = self.entries.get(key)
+                    if current is None or current['last_used'] <= entry['last_used']:
+                        self.entries[key] = entry
+                self.entries = {key: entry for key, entry in self.entries.items()
+                                if os.path.exists(self.blend_path(entry))}
+                self.evict()
+                write_json_atomic(self.catalog_path, {'version': LIBRARY_VERSION, 'entries': self.entries})
+        except OSError:
+            self.entries = own_entries
+            return False
+        return True
+
+    @staticmethod
+    def key(material_name, input_hash):
+        return material_name + "|" + input_hash
+
+    def blend_path(self, entry):
+        return os.path.join(self.library_dir, entry['file'])
+
+    def lookup(self, material_name, input_hash):
+        # Returns (blend path, datablock name) or None
+        entry = self.entries.get(self.key(material_name, input_hash))
+        if entry is None or not os.path.exists(self.blend_path(entry)):
+            self.misses += 1
+            return None
+        entry['last_used'] = time.time()
+        self.hits += 1
+        return self.blend_path(entry), entry['datablock']
+
+    def lookup_many(self, items):
+        # items: [(material_name, input_hash)]. Returns {blend path:
+        # [(material_name, datablock)]} so every file is opened once.
+        by_file = {}
+        for material_name, input_hash in items:
+            found = self.lookup(material_name, input_hash)
+            if found is not None:
+                by_file.setdefault(found[0], []).append((material_name, found[1]))
+        return by_file
+
+    def new_blend_path(self):
+        os.makedirs(self.library_dir, exist_ok=True)
+        key = f"{os.getpid()}|{time.time()}|{len(self.entries)}"
+        return os.path.join(self.library_dir, hashlib.sha1(key.encode('utf-8')).hexdigest()[:20] + ".blend")
+
+    def add(self, material_name, input_hash, blend_path, datablock):
+        try:
+            size = os.path.getsize(blend_path)
+        except OSError:
+            return
+        self.entries[self.key(material_name, input_hash)] = {
+            'file': os.path.basename(blend_path),
+            'datablock': datablock,
+            'size': size,
+            'last_used': time.time(),
+        }
+
+    def evict(self):
+        # Whole files go, so a file's last use is that of its newest entry.
+        # Old .blend files no entry refers to (a publish whose catalog update
+        # was lost) are deleted as well.
+        files = {}
+        for key, entry in self.entries.items():
+            size, last_used, keys = files.get(entry['file'], (entry['size'], 0, []))
+            keys.append(key)
+            files[entry['file']] = (size, max(last_used, entry['last_used']), keys)
+        total = sum(size for size, last_used, keys in files.values())
+        evicted = 0
+        for filename, (size, last_used, keys) in sorted(files.items(), key=lambda item: item[1][1]):
+            if total <= self.size_limit:
+                break
+            try:
+                os.remove(os.path.join(self.library_dir, filename))
+            except OSError:
+                pass
+            total -= size
+            for key in keys:
+                del self.entries[key]
+            evicted += len(keys)
+
+        referenced = {entry['file'] for entry in self.entries.values()}
+        try:
+            names = os.listdir(self.library_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if not name.endswith('.blend') or name in referenced:
+                continue
+            path = os.path.join(self.library_dir, name)
+            try:
+                if time.time() - os.path.getmtime(path) > LIBRARY_ORPHAN_AGE:
+                    os.remove(path)
+            except OSError:
+                continue
+        self.evicted += evicted
+        return evicted
+
+
+# Proxy textures
+
+FULL_PATH_PROPERTY = "texture_loader_full_path"
+PROXY_PATH_PROPERTY = "texture_loader_proxy_path"
+
+
+def pillow_available():
+    return importlib.util.find_spec("PIL") is not None
+
+
+def downscale_image(src, dst, factor):
+    # Writes src downscaled by factor to dst with Pillow; returns False when
+    # Pillow is not installed so the caller can fall back to Blender
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    with Image.open(src) as image:
+        width = max(1, image.width // factor)
+        height = max(1, image.height // factor)
+        proxy = image.resize((width, height), Image.BOX)
+    tmp_path = dst + ".tmp" + os.path.splitext(dst)[1]
+    proxy.save(tmp_path)
+    os.replace(tmp_path, dst)
+    return True
+
+
+class ProxyCache:
+    # Downscaled copies of textures, stored once per source file under
+    # cache/proxies/<factor>/ and keyed by path, size and mtime, so an edited
+    # texture gets a new proxy.
+
+    def __init__(self, factor, cache_dir=None, verbose=False):
+        self.factor = factor
+        self.verbose = verbose
+        self.proxy_dir = os.path.join(cache_dir or default_cache_dir(), "proxies", str(factor))
+        self.generated = 0
+        self.reused = 0
+        self.failed = 0
+        self.can_generate = pillow_available()
+        self._lock = threading.Lock()
+
+    def proxy_path(self, texture_path):
+        try:
+            st = os.stat(texture_path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(texture_path)}|{st.st_size}|{st.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+        base_name, ext = os.path.splitext(os.path.basename(texture_path))
+        return os.path.join(self.proxy_dir, digest[:2], f"{base_name}_{digest}{ext}")
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, texture_path):
+        # Returns the proxy path, generating it if Pillow is available, or None
+        proxy_path = self.proxy_path(texture_path)
+        if proxy_path is None:
+            return None
+        if os.path.exists(proxy_path):
+            self._count('reused')
+            return proxy_path
+        if not self.can_generate:
+            return None
+        os.makedirs(os.path.dirname(proxy_path), exist_ok=True)
+        try:
+            if not downscale_image(texture_path, proxy_path, self.factor):
+                return None
+        except Exception as e:
+            if self.verbose:
+                print(f"Could not downscale {texture_path}: {e}")
+            self._count('failed')
+            return None
+        self._count('generated')
+        return proxy_path
+
+    def generate(self, paths, workers=4):
+        # Returns {texture path: proxy path} for every proxy that exists afterwards
+        return run_steps(self.generate_steps(paths, workers))
+
+    def generate_steps(self, paths, workers=4):
+        # generate as a generator yielding (done, total) every few textures
+        paths = list(dict.fromkeys(paths))
+        proxy_paths = yield from map_in_batches(self.get, paths, workers, max(1, 2 * workers))
+        return {path: proxy_path for path, proxy_path in zip(paths, proxy_paths) if proxy_path}
+
+
+def image_buffer_size(width, height, channels, is_float):
+    return width * height * channels * (4 if is_float else 1)
+
+
+def plan_buffer_release(images, budget, keep=()):
+    # images: [(name, bytes, used)]. Unused buffers are always released, then
+    # the largest used ones not in keep until the total fits in budget.
+    release = [name for name, size, used in images if not used]
+    total = sum(size for name, size, used in images if used)
+    for name, size, used in sorted(images, key=lambda item: -item[1]):
+        if total <= budget:
+            break
+        if used and name not in keep:
+            release.append(name)
+            total -= size
+    return release, total
+
+
+# Profiling
+
+PROFILE_VERSION = 1
+
+
+def _peak_memory_reader():
+    # Built once: the Windows version defines a ctypes structure and function
+    # prototypes that are too slow to set up on every stage
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    if sys.platform != 'win32':
+        return lambda: None
+
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+    get_current_process.restype = wintypes.HANDLE
+    get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+    get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = get_current_process()
+
+    def read():
+        if get_memory_info(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return None
+    return read
+
+
+_read_peak_memory = None
+
+
+def peak_memory():
+    # Peak resident memory of this process in bytes, or None if unknown
+    global _read_peak_memory
+    if _read_peak_memory is None:
+        _read_peak_memory = _peak_memory_reader()
+    return _read_peak_memory()
+
+
+class Profiler:
+    # Wall time per stage plus named counters for one operator run. Nested
+    # stages are subtracted from the stage around them, so stage times add
+    # up to the time spent inside stages.
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self._start = time.perf_counter()
+        self._children = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            self.add_time(name, elapsed - child_time)
+
+    def steps(self, name, steps):
+        # Passes the progress of a step generator through, timing only the
+        # steps themselves and not the time between them
+        while True:
+            with self.stage(name):
+                try:
+                    progress = next(steps)
+                except StopIteration as stop:
+                    return stop.value
+            yield progress
+
+    def add_time(self, name, seconds, calls=1):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {'seconds': 0.0, 'calls': 0, 'peak_memory': None}
+        stage['seconds'] += seconds
+        stage['calls'] += calls
+        stage['peak_memory'] = peak_memory()
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            'version': PROFILE_VERSION,
+            'operator': self.name,
+            'started': self.started,
+            'seconds': round(time.perf_counter() - self._start, 6),
+            'peak_memory': peak_memory(),
+            'stages': {name: dict(stage, seconds=round(stage['seconds'], 6)) for name, stage in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def summary_lines(self):
+        data = self.to_dict()
+        lines = [f"{self.name}: {data['seconds']:.2f} s"]
+        if data['peak_memory']:
+            lines[0] += f", peak {data['peak_memory'] // (1024 * 1024)} MB"
+        for name, stage in sorted(data['stages'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"{name}: {stage['seconds']:.3f} s ({stage['calls']}x)")
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"{name}: {value}")
+        return lines
+
+    def save(self, report_dir=None):
+        report_dir = report_dir or os.path.join(default_cache_dir(), "reports")
+        # The pid and a random suffix keep reports of runs started in the
+        # same second (parallel shards, small jobs back to back) apart
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = os.path.join(report_dir, f"{self.name}_{stamp}_{os.getpid()}_{uuid.uuid4().hex[:8]}.json")
+        write_json_atomic(path, self.to_dict())
+        return path